@@ -16,8 +16,16 @@ number of cases of infections by day during an outbreak of the influenza virus.
 from .version_info import VERSION_INT, VERSION  # noqa
 
 # Import main classes
+from .serial_interval import compact_serial_interval  # noqa
 from .models import ForwardModel, BranchProModel, LocImpBranchProModel    # noqa
 from .simulation import SimulationController  # noqa
+from .extinction import extinction_probability, extinction_probabilities  # noqa
+from .trajectory_statistics import trajectory_statistics, exceedance_probabilities  # noqa
 from .apps import IncidenceNumberPlot, _SliderComponent, BranchProDashApp, IncidenceNumberSimulationApp, ReproductionNumberPlot, BranchProInferenceApp # noqa
 from ._dataset_library_api import DatasetLibrary # noqa
+from .inference_result import InferenceResult, save_inference_results, load_inference_results # noqa
 from .posterior import BranchProPosterior, BranchProPosteriorMultSI, LocImpBranchProPosterior, LocImpBranchProPosteriorMultSI # noqa
+from .abc_inference import LocImpBranchProABC # noqa
+from .particle_filter import BranchProParticleFilter # noqa
+from .multi_region import MultiRegionBranchProPosterior # noqa
+from .backtesting import backtest # noqa
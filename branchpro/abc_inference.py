@@ -0,0 +1,296 @@
+#
+# LocImpBranchProABC Class
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from branchpro import LocImpBranchProModel
+
+
+def _simulate_batch(
+        serial_interval, imported_infectives, initial_cases, r_profiles,
+        epsilons, seed):
+    """
+    Simulates a batch of local incidence trajectories of the
+    :class:`LocImpBranchProModel` at once, one for each row of
+    ``r_profiles``.
+
+    The renewal sum is evaluated for all trajectories in a single matrix
+    product per time step, instead of one call to
+    :meth:`LocImpBranchProModel.simulate` per parameter set.
+
+    Parameters
+    ----------
+    serial_interval
+        (1D numpy array) normalised serial interval, in inverted order as
+        stored by the model.
+    imported_infectives
+        (1D numpy array) effective number of imported infectives at each
+        time point, shared by all trajectories.
+    initial_cases
+        number of local cases at time 0.
+    r_profiles
+        (2D numpy array) reproduction numbers for each trajectory (rows) and
+        each day 1, 2, ..., T (columns).
+    epsilons
+        (1D numpy array) proportionality constant of the R number for
+        imported cases for each trajectory.
+    seed
+        seed of the random number generator used for the Poisson draws.
+
+    Returns
+    -------
+    (2D numpy array) local incidences with shape ``(n_runs, T + 1)``.
+    """
+    rng = np.random.default_rng(seed)
+    n_runs, last_time_point = r_profiles.shape
+    si_len = len(serial_interval)
+
+    incidences = np.empty((n_runs, last_time_point + 1))
+    incidences[:, 0] = initial_cases
+
+    for t in range(1, last_time_point + 1):
+        start_date = max(t - si_len, 0)
+        local_infectives = incidences[:, start_date:t] @ (
+            serial_interval[-(t - start_date):])
+        norm_daily_mean = r_profiles[:, t-1] * (
+            local_infectives +
+            (1 + epsilons) * imported_infectives[t])
+        incidences[:, t] = rng.poisson(lam=norm_daily_mean)
+
+    return incidences
+
+
+def _batch_distances(
+        serial_interval, imported_infectives, initial_cases, r_profiles,
+        epsilons, seed, observed):
+    """
+    Simulates a batch of trajectories and returns the root mean squared
+    distance of each of them to the observed incidences.
+    """
+    incidences = _simulate_batch(
+        serial_interval, imported_infectives, initial_cases, r_profiles,
+        epsilons, seed)
+    return np.sqrt(np.mean((incidences[:, 1:] - observed) ** 2, axis=1))
+
+
+class LocImpBranchProABC(object):
+    r"""LocImpBranchProABC Class:
+    Class for the approximate Bayesian computation (ABC) of the parameters
+    of a :class:`LocImpBranchProModel` from observed local incidence data:
+    the proportionality constant :math:`\epsilon` of the R number for
+    imported cases and a piecewise-constant R_t profile.
+
+    Unlike :class:`LocImpBranchProPosterior`, no conjugacy is required:
+    candidate parameter sets are drawn from the priors, trajectories are
+    simulated from the model and the candidates whose trajectories lie
+    closest to the observed data (rejection ABC) form the approximate
+    posterior sample. Candidates are simulated in vectorised batches,
+    optionally spread across a pool of processes.
+
+    Parameters
+    ----------
+    model
+        (LocImpBranchProModel) model providing the serial interval and the
+        imported cases used in the simulations.
+    inc_data
+        (pandas Dataframe) contains numbers of local new cases by time unit
+        (usually days), starting at time 0. The incidence at time 0 is used as
+        the initial number of cases of the simulations.
+        Data stored in columns of with one for time and one for incidence
+        number, respectively.
+    r_start_times
+        sequence of the first time unit when each of the inferred
+        reproduction numbers is used, as in
+        :meth:`LocImpBranchProModel.set_r_profile`.
+    r_prior
+        (scipy.stats frozen distribution) prior of each of the
+        reproduction numbers.
+    epsilon_prior
+        (scipy.stats frozen distribution) prior of epsilon; its support must
+        be contained in :math:`[-1, \infty)`.
+    time_key
+        label key given to the temporal data in the inc_data dataframe.
+    inc_key
+        label key given to the incidental data in the inc_data dataframe.
+
+    Notes
+    -----
+    Always apply method run_inference before calling
+    :meth:`LocImpBranchProABC.get_intervals` to get the parameters dataframe!
+    """
+    def __init__(
+            self, model, inc_data, r_start_times, r_prior, epsilon_prior,
+            time_key='Time', inc_key='Incidence Number'):
+
+        if not isinstance(model, LocImpBranchProModel):
+            raise TypeError(
+                'Model needs to be a branchpro.LocImpBranchProModel')
+
+        if not hasattr(model, '_imported_times'):
+            raise ValueError(
+                'Imported cases need to be set on the model')
+
+        if not issubclass(type(inc_data), pd.DataFrame):
+            raise TypeError('Incidence data has to be a dataframe')
+
+        if time_key not in inc_data.columns:
+            raise ValueError('No time column with this name in given data')
+
+        if inc_key not in inc_data.columns:
+            raise ValueError(
+                'No incidence column with this name in given data')
+
+        if min(inc_data[time_key]) != 0:
+            raise ValueError('Incidence data must start at time 0')
+
+        if np.asarray(r_start_times).ndim != 1:
+            raise ValueError(
+                'Starting times values storage format must be 1-dimensional')
+        if np.any(np.asarray(r_start_times)[:-1] >=
+                  np.asarray(r_start_times)[1:]):
+            raise ValueError('Times must be increasing.')
+
+        # Pad with zeros the time points where we have no information on
+        # the number of incidences
+        padded_inc_data = inc_data.set_index(time_key).reindex(
+            range(max(inc_data[time_key])+1)).fillna(0).reset_index()
+        cases_data = padded_inc_data[inc_key].to_numpy()
+
+        self.model = model
+        self._initial_cases = cases_data[0]
+        self._observed = cases_data[1:]
+        self._r_start_times = np.ceil(r_start_times).astype(int)
+        self.r_prior = r_prior
+        self.epsilon_prior = epsilon_prior
+
+    def _imported_infectives(self, last_time_point):
+        """
+        Computes the effective number of imported infectives at each time
+        point up to ``last_time_point``, as used by
+        :meth:`LocImpBranchProModel.simulate`.
+        """
+        imported_incidences = np.zeros(last_time_point + 1)
+        mask = self.model._imported_times <= last_time_point
+        np.put(
+            imported_incidences, ind=self.model._imported_times[mask],
+            v=self.model._imported_cases[mask])
+
+        serial_interval = self.model.get_serial_intervals() / (
+            self.model._normalizing_const)
+        return np.append(
+            0, np.convolve(imported_incidences, serial_interval)[
+                :last_time_point])
+
+    def _r_profiles(self, r_values):
+        """
+        Expands the sampled reproduction numbers of each segment into daily
+        R_t profiles of shape ``(n_candidates, T)``.
+        """
+        days = np.arange(1, len(self._observed) + 1)
+        segment = np.searchsorted(self._r_start_times, days, side='right') - 1
+        return r_values[:, np.clip(segment, 0, len(self._r_start_times) - 1)]
+
+    def run_inference(
+            self, num_candidates, accept_fraction=0.01, batch_size=1000,
+            n_workers=None):
+        """
+        Runs the rejection ABC inference of epsilon and the R_t profile.
+
+        ``num_candidates`` parameter sets are drawn from the priors and
+        simulated in batches of ``batch_size``; the fraction
+        ``accept_fraction`` of them whose trajectories are closest (in root
+        mean squared distance) to the observed data are accepted.
+
+        Parameters
+        ----------
+        num_candidates
+            (int) number of parameter sets drawn from the priors.
+        accept_fraction
+            (float) fraction of the candidates accepted as posterior samples.
+        batch_size
+            (int) number of candidates simulated in a single vectorised
+            batch.
+        n_workers
+            (int) number of processes the batches are distributed across; if
+            None, all batches are run in the current process.
+        """
+        if not 0 < accept_fraction <= 1:
+            raise ValueError('Accepted fraction must be in (0, 1].')
+
+        num_segments = len(self._r_start_times)
+        r_values = np.reshape(
+            self.r_prior.rvs(size=num_candidates * num_segments),
+            (num_candidates, num_segments))
+        epsilons = np.asarray(
+            self.epsilon_prior.rvs(size=num_candidates), dtype=float)
+
+        serial_interval = self.model._serial_interval / (
+            self.model._normalizing_const)
+        imported_infectives = self._imported_infectives(len(self._observed))
+        r_profiles = self._r_profiles(r_values)
+
+        batches = [
+            (serial_interval, imported_infectives, self._initial_cases,
+             r_profiles[start:(start + batch_size)],
+             epsilons[start:(start + batch_size)],
+             np.random.randint(2**31), self._observed)
+            for start in range(0, num_candidates, batch_size)]
+
+        if n_workers is None:
+            distances = [_batch_distances(*batch) for batch in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                distances = list(executor.map(
+                    _batch_distances, *zip(*batches)))
+        distances = np.concatenate(distances)
+
+        num_accepted = max(1, int(round(accept_fraction * num_candidates)))
+        accepted = np.argpartition(distances, num_accepted - 1)[:num_accepted]
+
+        self.tolerance = np.max(distances[accepted])
+        self.accepted_distances = distances[accepted]
+        self.accepted_r = r_values[accepted]
+        self.accepted_epsilon = epsilons[accepted]
+
+    def get_intervals(self, central_prob):
+        """
+        Returns a dataframe of the ABC posterior mean of epsilon and of each
+        reproduction number of the profile, with percentiles.
+
+        The results are returned in a dataframe with the following columns:
+        'Parameter', 'Start Time', 'Mean', 'Lower bound CI', 'Upper bound CI'
+        and 'Central Probability'
+
+        Parameters
+        ----------
+        central_prob
+            level of the computed credible interval of the estimated
+            parameter values. The interval the central probability.
+        """
+        samples = np.column_stack((self.accepted_epsilon, self.accepted_r))
+        lb = 100*(1-central_prob)/2
+        ub = 100*(1+central_prob)/2
+        post_dist_interval = np.percentile(
+            samples, q=np.array([lb, ub]), axis=0)
+
+        intervals_df = pd.DataFrame(
+            {
+                'Parameter': ['epsilon'] + ['R'] * len(self._r_start_times),
+                'Start Time': [np.nan] + list(self._r_start_times),
+                'Mean': np.mean(samples, axis=0),
+                'Lower bound CI': post_dist_interval[0],
+                'Upper bound CI': post_dist_interval[1],
+                'Central Probability': central_prob
+            }
+        )
+
+        return intervals_df
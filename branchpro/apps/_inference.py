@@ -34,6 +34,10 @@ class BranchProInferenceApp(BranchProDashApp):
             'interval_storage': None,
             'posterior_storage': None}
 
+        # Posterior of the last data and serial intervals used, reused while
+        # only the prior, tau or epsilon change
+        self._posterior_cache = None
+
         button_style = {
                             'width': '100%',
                             'height': '60px',
@@ -252,12 +256,23 @@ class BranchProInferenceApp(BranchProDashApp):
             raise dash.exceptions.PreventUpdate()
 
         time_label, inc_label = data.columns[:2]
-        num_cols = len(self.session_data.get('interval_storage').columns)
+        interval_data = self.session_data.get('interval_storage')
+        num_cols = len(interval_data.columns)
 
         prior_params = (new_alpha, new_beta)
         labels = {'time_key': time_label, 'inc_key': inc_label}
 
-        if num_cols == 1:
+        if (self._posterior_cache is not None) and (
+                self._posterior_cache[0].equals(data)) and (
+                self._posterior_cache[1].equals(interval_data)):
+            # Same data and serial intervals; the cached infectiousness of
+            # the posterior is reused
+            posterior = self._posterior_cache[2]
+            posterior.prior_parameters = prior_params
+            if 'Imported Cases' in data.columns:
+                posterior.set_epsilon(epsilon)
+
+        elif num_cols == 1:
             serial_interval = self.session_data.get(
                 'interval_storage').iloc[:, 0].values
 
@@ -312,6 +327,8 @@ class BranchProInferenceApp(BranchProDashApp):
                     *prior_params,
                     **labels)
 
+        self._posterior_cache = (data, interval_data, posterior)
+
         posterior.run_inference(tau)
         return posterior.get_intervals(central_prob)
 
@@ -0,0 +1,261 @@
+#
+# Rolling-origin backtesting of the posterior forecasts
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+from branchpro import BranchProPosteriorMultSI, BranchProParticleFilter
+
+
+def _simulated_forecasts(
+        shape, rate, cases_data, other_rates, serial_interval, origins,
+        horizons, probs, num_samples, seeds):
+    """
+    Returns the mean, the percentiles and the log-probability of the observed
+    incidence number of the forecasts of several horizons from several
+    origins, estimated from simulations of the renewal equation.
+
+    From each origin, reproduction numbers are drawn from the posterior of
+    the window ending at the origin, and incidences are simulated forward
+    with them for the largest horizon. The incidence number at each horizon
+    is Poisson given the simulated past, so that its mean and probabilities
+    are averaged over the draws of its Poisson rate rather than estimated
+    from the simulated counts.
+
+    Parameters
+    ----------
+    shape
+        (1D numpy array) shape parameters of the posterior at the origins.
+    rate
+        (1D numpy array) rate parameters of the posterior at the origins.
+    cases_data
+        (1D numpy array) local incidence numbers of the whole series.
+    other_rates
+        (1D numpy array) infectiousness of the other terms of the rate of the
+        posterior (e.g. imported cases) at every time point of the series.
+    serial_interval
+        (1D numpy array) normalised serial interval, in reversed order.
+    origins
+        (1D numpy array) indices in the series of the origins.
+    horizons
+        (1D numpy array) horizons of the forecasts, in time units.
+    probs
+        (1D numpy array) probabilities of the percentiles.
+    num_samples
+        (int) number of simulations from each origin.
+    seeds
+        sequence of :class:`numpy.random.SeedSequence`, one per origin.
+
+    Returns
+    -------
+    tuple
+        The means, percentiles and log-probabilities, of shapes
+        ``(n_origins, n_horizons)``, ``(len(probs), n_origins, n_horizons)``
+        and ``(n_origins, n_horizons)``; forecasts past the end of the series
+        are NaN.
+    """
+    num_serial = len(serial_interval)
+    max_horizon = np.max(horizons)
+
+    mean = np.full((len(origins), len(horizons)), np.nan)
+    percentiles = np.full((len(probs),) + mean.shape, np.nan)
+    log_score = np.full(mean.shape, np.nan)
+
+    for o, (origin, seed) in enumerate(zip(origins, seeds)):
+        rng = np.random.default_rng(seed)
+        r_values = rng.gamma(shape[o], 1 / rate[o], size=num_samples)
+
+        # incidences of the last num_serial time points of every simulation
+        paths = np.zeros((num_samples, num_serial + max_horizon))
+        history = cases_data[max(origin + 1 - num_serial, 0):(origin + 1)]
+        paths[:, (num_serial - len(history)):num_serial] = history
+
+        last_step = min(max_horizon, len(cases_data) - 1 - origin)
+        for step in range(1, last_step + 1):
+            lam = r_values * (
+                paths[:, (step - 1):(step - 1 + num_serial)] @ serial_interval
+                + other_rates[origin + step])
+            paths[:, num_serial + step - 1] = rng.poisson(lam)
+
+            for h in np.flatnonzero(horizons == step):
+                observed = cases_data[origin + step]
+                mean[o, h] = np.mean(lam)
+                percentiles[:, o, h] = np.quantile(
+                    paths[:, num_serial + step - 1], probs)
+                with np.errstate(divide='ignore'):
+                    log_score[o, h] = np.log(np.mean(
+                        scipy.stats.poisson.pmf(observed, lam)))
+
+    return mean, percentiles, log_score
+
+
+def backtest(
+        posterior, tau, horizons=(1,), central_prob=0.95, origins=None,
+        num_samples=1000, n_workers=None, seed=None):
+    """
+    Returns a dataframe of the forecasts of the incidence numbers from every
+    origin of a series, made with the posterior of the reproduction number
+    of the window ending at the origin, and their scores against the
+    observed incidence numbers.
+
+    The infectiousness only depends on past incidences, so the posterior of
+    the window ending at an origin is the one of the inference on the whole
+    series: the inference is run once, from a single set of prefix sums, for
+    all the origins. The forecasts of horizon 1 are the negative binomial
+    posterior predictive distributions, computed in closed form for all the
+    origins at once. The forecasts of larger horizons are estimated from
+    ``num_samples`` simulations of the renewal equation from each origin,
+    with the reproduction number drawn from the posterior and kept constant,
+    and the imported cases, if any, as observed. The simulations are
+    distributed across ``n_workers`` processes, with one random seed per
+    origin so that the results do not depend on the number of processes.
+
+    The results are returned in a dataframe with one row per origin and
+    horizon, and the following columns: 'Origin', 'Horizon', 'Time Points'
+    (time of the forecast incidence number), 'Mean', 'Lower bound CI',
+    'Upper bound CI', 'Central Probability', 'Observed', 'Covered' (whether
+    the observed incidence number lies in the prediction interval) and
+    'Log Score' (log-probability of the observed incidence number).
+
+    Parameters
+    ----------
+    posterior
+        (BranchProPosterior) posterior of the reproduction number holding the
+        incidence data of the series, e.g. a :class:`BranchProPosterior` or
+        :class:`LocImpBranchProPosterior`; its inference is run with ``tau``.
+    tau
+        size sliding time window over which the reproduction number is
+        estimated.
+    horizons
+        sequence of the numbers of time units after the origins at which the
+        incidence numbers are forecast.
+    central_prob
+        level of the computed prediction intervals of the incidence numbers.
+    origins
+        Optional sequence of the times of the origins; defaults to every time
+        point with an inferred reproduction number and an observed incidence
+        number after it.
+    num_samples
+        (int) number of simulations from each origin for the horizons larger
+        than 1.
+    n_workers
+        (int) Optional number of processes the origins are distributed
+        across for the simulations; if None, they are run in the current
+        process.
+    seed
+        Optional seed of the random generators of the simulations.
+    """
+    if isinstance(posterior, (
+            BranchProPosteriorMultSI, BranchProParticleFilter)):
+        raise TypeError(
+            'Backtesting requires a single Gamma-shaped posterior.')
+    posterior._check_scalar_prior()
+
+    horizons = np.asarray(horizons)
+    if (horizons.ndim != 1) or np.any(horizons < 1):
+        raise ValueError('Horizons must be a sequence of positive integers.')
+
+    posterior.run_inference(tau)
+    shape = posterior.inference_posterior.args[0]
+    rate = 1 / posterior.inference_posterior.kwds['scale']
+    inference_times = np.array(posterior.inference_times)
+    cases_data = posterior.cases_data
+    num_times = len(cases_data)
+
+    if origins is None:
+        origins = inference_times[:-1]
+    origins = np.asarray(origins)
+    if np.any(~np.isin(origins, inference_times)):
+        raise ValueError('Origins must be time points of the inference.')
+
+    # positions of the origins among the windows and in the series
+    windows = np.searchsorted(inference_times, origins)
+    indices = windows + num_times - len(inference_times)
+
+    probs = np.array([1 - central_prob, 1 + central_prob]) / 2
+    mean = np.full((len(origins), len(horizons)), np.nan)
+    percentiles = np.full((2,) + mean.shape, np.nan)
+    log_score = np.full(mean.shape, np.nan)
+
+    # closed-form negative binomial forecasts of horizon 1
+    daily_rates = posterior._daily_rates()
+    in_series = indices + 1 < num_times
+    if np.any(horizons == 1) and np.any(in_series):
+        next_rates = daily_rates[indices[in_series] + 1]
+        window_shape = shape[windows[in_series]]
+        window_rate = rate[windows[in_series]]
+        predictive = scipy.stats.nbinom(
+            window_shape, window_rate / (window_rate + next_rates))
+        for h in np.flatnonzero(horizons == 1):
+            mean[in_series, h] = window_shape * next_rates / window_rate
+            percentiles[:, in_series, h] = predictive.ppf(probs[:, np.newaxis])
+            with np.errstate(divide='ignore'):
+                log_score[in_series, h] = predictive.logpmf(
+                    cases_data[indices[in_series] + 1])
+
+    # simulated forecasts of the larger horizons
+    simulated = horizons > 1
+    if np.any(simulated):
+        serial_interval = posterior._serial_interval / (
+            posterior._normalizing_const)
+        other_rates = sum((
+            coefficient * posterior._infectiousness(data)
+            for coefficient, data in posterior._rate_data()
+            if data is not cases_data), np.zeros(num_times))
+        seeds = np.random.SeedSequence(seed).spawn(len(origins))
+        blocks = np.array_split(
+            np.arange(len(origins)),
+            1 if n_workers is None else n_workers)
+        arguments = [
+            (shape[windows[block]], rate[windows[block]], cases_data,
+             other_rates, serial_interval, indices[block],
+             horizons[simulated], probs, num_samples,
+             [seeds[o] for o in block])
+            for block in blocks]
+
+        if n_workers is None:
+            results = [_simulated_forecasts(*args) for args in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                results = list(executor.map(
+                    _simulated_forecasts, *zip(*arguments)))
+
+        block_mean, block_percentiles, block_log_score = zip(*results)
+        mean[:, simulated] = np.concatenate(block_mean)
+        percentiles[:, :, simulated] = np.concatenate(
+            block_percentiles, axis=1)
+        log_score[:, simulated] = np.concatenate(block_log_score)
+
+    observed = np.full(mean.shape, np.nan)
+    targets = indices[:, np.newaxis] + horizons
+    observed[targets < num_times] = cases_data[targets[targets < num_times]]
+
+    backtest_df = pd.DataFrame(
+        {
+            'Origin': np.repeat(origins, len(horizons)),
+            'Horizon': np.tile(horizons, len(origins)),
+            'Time Points': (origins[:, np.newaxis] + horizons).ravel(),
+            'Mean': mean.ravel(),
+            'Lower bound CI': percentiles[0].ravel(),
+            'Upper bound CI': percentiles[1].ravel(),
+            'Central Probability': central_prob,
+            'Observed': observed.ravel(),
+            'Covered': (
+                (percentiles[0] <= observed) & (
+                    observed <= percentiles[1])).ravel(),
+            'Log Score': log_score.ravel()
+        }
+    )
+
+    # forecasts past the end of the series cannot be scored
+    return backtest_df[~np.isnan(backtest_df['Observed'])].reset_index(
+        drop=True)
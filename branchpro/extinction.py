@@ -0,0 +1,136 @@
+#
+# Extinction probability of branching processes
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import numpy as np
+import scipy.special
+
+from branchpro import BranchProModel, LocImpBranchProModel
+
+# Distance of R above 1 below which the extinction probability of a lineage
+# starts from its expansion around R = 1 rather than the Lambert W function,
+# and number of Newton steps refining it
+_CRITICAL_DISTANCE = 1e-3
+_NEWTON_STEPS = 4
+
+
+def _offspring_extinction(r):
+    r"""
+    Returns the probability of extinction of the lineage of a single case
+    whose number of offspring is Poisson distributed with mean ``r``.
+
+    This is the smallest root in :math:`[0, 1]` of the fixed point equation
+    of the offspring generating function
+
+    .. math::
+        q = e^{R(q-1)},
+
+    given in closed form by the principal branch of the Lambert W function.
+    Close to :math:`R = 1`, where the Lambert W function is evaluated next to
+    its branch point and loses accuracy, the expansion
+    :math:`1 - q = 2(R-1)/R^2 + O((R-1)^2)` is used instead. The root is then
+    refined by Newton steps on the equation of :math:`x = 1 - q` divided by
+    :math:`x`,
+
+    .. math::
+        1 + \frac{e^{-Rx} - 1}{x} = 0,
+
+    whose root is well-conditioned relative to :math:`x`.
+    """
+    r = np.asarray(r, dtype=float)
+    if np.any(r < 0):
+        raise ValueError('Reproduction numbers must be non-negative.')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # -r exp(-r) can be rounded below the branch point -1/e
+        x = np.where(
+            r - 1 < _CRITICAL_DISTANCE, 2 * (r - 1) / r ** 2,
+            1 + np.real(scipy.special.lambertw(np.maximum(
+                -r * np.exp(-r), np.nextafter(-1 / np.e, 0)))) / r)
+
+        for _ in range(_NEWTON_STEPS):
+            decay = np.expm1(-r * x)
+            x = x - (1 + decay / x) * x ** 2 / (
+                -r * x * (1 + decay) - decay)
+
+    return np.where(r <= 1, 1.0, np.clip(1 - x, 0, 1))
+
+
+def extinction_probability(model, initial_cases):
+    r"""
+    Returns the probability of eventual extinction of an outbreak following
+    a :class:`BranchProModel`; the probability of a large outbreak is its
+    complement.
+
+    In the renewal model, each case causes a Poisson distributed number of
+    new cases with mean R, whatever the serial interval. The lineage of each
+    initial case hence dies out with probability q, the smallest solution in
+    :math:`[0, 1]` of :math:`q = e^{R(q-1)}`, and the outbreak dies out with
+    probability :math:`q^{I_0}`. For a :class:`LocImpBranchProModel`, each
+    imported case causes a Poisson distributed number of local cases with
+    mean :math:`(1 + \epsilon)R` and further multiplies the probability by
+    :math:`e^{(1 + \epsilon)R(q-1)}`.
+
+    The reproduction number is taken to be constant and equal to its initial
+    value in the model.
+
+    Parameters
+    ----------
+    model
+        (BranchProModel) model whose reproduction number (and epsilon and
+        imported cases, if any) is used.
+    initial_cases
+        number of cases at time 0.
+    """
+    if not isinstance(model, BranchProModel):
+        raise TypeError(
+            'Model needs to be a branchpro.BranchProModel')
+
+    r = model.get_r_profile()[0]
+    q = _offspring_extinction(r)
+    prob = q ** initial_cases
+
+    if isinstance(model, LocImpBranchProModel) and hasattr(
+            model, '_imported_cases'):
+        prob *= np.exp(
+            (1 + model.epsilon) * r * (q - 1) *
+            np.sum(model._imported_cases))
+
+    return float(prob)
+
+
+def extinction_probabilities(r, initial_cases):
+    """
+    Returns the probabilities of eventual extinction of an outbreak
+    following a :class:`BranchProModel` on a grid of reproduction numbers
+    and initial numbers of cases; the probabilities of a large outbreak are
+    their complements.
+
+    See :func:`extinction_probability` for the computation of each value.
+
+    Parameters
+    ----------
+    r
+        sequence of (constant) reproduction numbers.
+    initial_cases
+        sequence of numbers of cases at time 0.
+
+    Returns
+    -------
+    (numpy array) probabilities of extinction of shape
+    ``(len(r), len(initial_cases))``.
+    """
+    if np.asarray(r).ndim != 1:
+        raise ValueError(
+            'Reproduction numbers storage format must be 1-dimensional')
+    if np.asarray(initial_cases).ndim != 1:
+        raise ValueError(
+            'Initial cases storage format must be 1-dimensional')
+
+    q = _offspring_extinction(r)
+    return q[:, np.newaxis] ** np.asarray(initial_cases)[np.newaxis, :]
@@ -0,0 +1,251 @@
+#
+# InferenceResult Class
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.special
+import scipy.stats
+
+
+class InferenceResult(object):
+    r"""InferenceResult Class:
+    Compact results of an inference of the reproduction numbers with a
+    Gamma-shaped posterior, as returned by
+    :meth:`BranchProPosterior.get_inference_result`.
+
+    Only the shape and rate parameters of the posterior at consecutive time
+    points are held, in contiguous arrays, together with the parameters of
+    the inference; the time points are given by the first one. The means,
+    percentiles and dataframe of the results are computed when asked for,
+    and the attributes are fixed by ``__slots__``, so that many results can
+    be held at a small memory cost.
+
+    Parameters
+    ----------
+    time_start
+        (int) time point of the first inferred reproduction number.
+    shape
+        (1D numpy array) shape parameters of the posterior at each time
+        point.
+    rate
+        (1D numpy array) rate parameters of the posterior at each time point.
+    prior_parameters
+        (tuple) shape and rate parameters of the Gamma distribution of the
+        prior.
+    tau
+        size sliding time window over which the reproduction number is
+        estimated.
+    epsilon
+        (numeric) Optional proportionality constant of the R number for
+        imported cases with respect to its analog for local ones.
+    serial_interval_hash
+        (str) Optional hash of the normalised serial interval of the
+        inference, identifying the kernel the results were computed with.
+    """
+    __slots__ = (
+        'time_start', 'shape', 'rate', 'prior_parameters', 'tau', 'epsilon',
+        'serial_interval_hash')
+
+    def __init__(
+            self, time_start, shape, rate, prior_parameters, tau,
+            epsilon=None, serial_interval_hash=None):
+
+        shape = np.ascontiguousarray(shape, dtype=float)
+        rate = np.ascontiguousarray(rate, dtype=float)
+        if (shape.ndim != 1) or (shape.shape != rate.shape):
+            raise ValueError(
+                'Shape and rate parameters must be 1-dimensional arrays of '
+                'the same length')
+
+        self.time_start = int(time_start)
+        self.shape = shape
+        self.rate = rate
+        self.prior_parameters = tuple(prior_parameters)
+        self.tau = tau
+        self.epsilon = epsilon
+        self.serial_interval_hash = serial_interval_hash
+
+    def get_times(self):
+        """
+        Returns the time points of the inferred reproduction numbers.
+
+        """
+        return np.arange(self.time_start, self.time_start + len(self.shape))
+
+    def get_posterior(self):
+        """
+        Returns the Gamma-shaped posterior distribution of the reproduction
+        numbers over time.
+
+        """
+        return scipy.stats.gamma(self.shape, scale=1/self.rate)
+
+    def mean(self):
+        """
+        Returns the means of the posterior over time.
+
+        """
+        return self.shape / self.rate
+
+    def quantiles(self, probs):
+        """
+        Returns the quantiles of the posterior over time at the given
+        probabilities, of shape ``(len(probs), n_times)``, computed by the
+        inverse of the regularised incomplete gamma function.
+
+        Parameters
+        ----------
+        probs
+            (sequence) probabilities of the quantiles.
+        """
+        probs = np.asarray(probs, dtype=float)[:, np.newaxis]
+        return scipy.special.gammaincinv(self.shape, probs) / self.rate
+
+    def get_intervals(self, central_prob):
+        """
+        Returns a dataframe of the reproduction number posterior mean
+        with percentiles over time, as :meth:`BranchProPosterior.get_intervals`
+        does.
+
+        The results are returned in a dataframe with the following columns:
+        'Time Points', 'Mean', 'Lower bound CI' and 'Upper bound CI'
+
+        Parameters
+        ----------
+        central_prob
+            level of the computed credible interval of the estimated
+            R number values. The interval the central probability.
+        """
+        lower, upper = self.quantiles(
+            [(1 - central_prob) / 2, (1 + central_prob) / 2])
+
+        return pd.DataFrame(
+            {
+                'Time Points': self.get_times(),
+                'Mean': self.mean(),
+                'Lower bound CI': lower,
+                'Upper bound CI': upper,
+                'Central Probability': central_prob
+            }
+        )
+
+
+def _optional_values(values):
+    """
+    Returns an array of floats of optional numeric values, with NaN for the
+    missing ones.
+    """
+    return np.array(
+        [np.nan if value is None else value for value in values],
+        dtype=float)
+
+
+def _optional_value(value, kind):
+    """
+    Returns an optional numeric value stored by :func:`_optional_values`,
+    converted to the given type, or None if it is missing.
+    """
+    return None if np.isnan(value) else kind(value)
+
+
+def save_inference_results(directory, results):
+    """
+    Saves inference results to a directory of binary NumPy files, which can
+    be reloaded memory-mapped by :func:`load_inference_results`.
+
+    The shape and rate parameters of all the results are concatenated in
+    the files ``shape.npy`` and ``rate.npy``, written through memory maps
+    without gathering them in memory, and the parameters of the inferences
+    (first time point, prior, tau, epsilon and serial interval hash) with the
+    offsets of the results in these arrays are saved in ``index.npz``.
+
+    Parameters
+    ----------
+    directory
+        (str) path of the directory, created if it does not exist; files of
+        previous results in it are overwritten.
+    results
+        (dict) :class:`InferenceResult` objects by name, e.g. by region;
+        the names are saved as strings.
+    """
+    os.makedirs(directory, exist_ok=True)
+    names = list(results)
+    results = [results[name] for name in names]
+    offsets = np.cumsum([0] + [len(result.shape) for result in results])
+
+    for key in ['shape', 'rate']:
+        values = np.lib.format.open_memmap(
+            os.path.join(directory, key + '.npy'), mode='w+', dtype=float,
+            shape=(offsets[-1],))
+        for start, end, result in zip(offsets[:-1], offsets[1:], results):
+            values[start:end] = getattr(result, key)
+        values.flush()
+        del values
+
+    np.savez(
+        os.path.join(directory, 'index.npz'),
+        names=np.array([str(name) for name in names], dtype=str),
+        offsets=offsets,
+        time_start=np.array(
+            [result.time_start for result in results], dtype=int),
+        alpha=np.array(
+            [result.prior_parameters[0] for result in results], dtype=float),
+        beta=np.array(
+            [result.prior_parameters[1] for result in results], dtype=float),
+        tau=_optional_values([result.tau for result in results]),
+        epsilon=_optional_values([result.epsilon for result in results]),
+        serial_interval_hash=np.array(
+            ['' if result.serial_interval_hash is None
+             else result.serial_interval_hash for result in results],
+            dtype=str))
+
+
+def load_inference_results(directory, mmap_mode='r'):
+    """
+    Loads the inference results saved in a directory by
+    :func:`save_inference_results`.
+
+    By default, the shape and rate parameters of the results are views of
+    read-only memory maps of the files, so that only the parts used are
+    read from the disk.
+
+    Parameters
+    ----------
+    directory
+        (str) path of the directory.
+    mmap_mode
+        Memory-map mode of :func:`numpy.load` of the shape and rate
+        parameters; if None, they are read into memory.
+
+    Returns
+    -------
+    (dict) :class:`InferenceResult` objects by name.
+    """
+    with np.load(
+            os.path.join(directory, 'index.npz'), allow_pickle=False) as index:
+        index = dict(index)
+
+    shape, rate = (
+        np.load(
+            os.path.join(directory, key + '.npy'), mmap_mode=mmap_mode,
+            allow_pickle=False)
+        for key in ['shape', 'rate'])
+    offsets = index['offsets']
+
+    return {
+        name: InferenceResult(
+            index['time_start'][r], shape[offsets[r]:offsets[r + 1]],
+            rate[offsets[r]:offsets[r + 1]],
+            (float(index['alpha'][r]), float(index['beta'][r])),
+            _optional_value(index['tau'][r], int),
+            _optional_value(index['epsilon'][r], float),
+            str(index['serial_interval_hash'][r]) or None)
+        for r, name in enumerate(index['names'].tolist())}
@@ -8,6 +8,8 @@
 #
 import numpy as np
 
+from branchpro.serial_interval import compact_serial_interval
+
 
 class ForwardModel(object):
     """ForwardModel Class:
@@ -79,10 +81,15 @@ class BranchProModel(ForwardModel):
         (list) Unnormalised probability distribution of that the recipient
         first displays symptoms s days after the infector first displays
         symptoms.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of the serial interval
+        removed from its tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`. The removed fraction is stored in
+        ``si_truncation_error``.
 
     """
 
-    def __init__(self, initial_r, serial_interval):
+    def __init__(self, initial_r, serial_interval, si_tolerance=None):
         super(BranchProModel, self).__init__()
 
         if np.asarray(serial_interval).ndim != 1:
@@ -93,11 +100,26 @@ class BranchProModel(ForwardModel):
         if not isinstance(initial_r, (int, float)):
             raise TypeError('Value of R must be integer or float.')
 
+        self._si_tolerance = si_tolerance
+
         # Invert order of serial intervals for ease in _normalised_daily_mean
-        self._serial_interval = np.asarray(serial_interval)[::-1]
+        self._serial_interval = self._compact(serial_interval)[::-1]
         self._r_profile = np.array([initial_r])
         self._normalizing_const = np.sum(self._serial_interval)
 
+    def _compact(self, serial_interval):
+        """
+        Trims the tail of the serial interval to the tolerance of the model,
+        if one was given, and records the fraction of mass removed.
+        """
+        if self._si_tolerance is None:
+            self.si_truncation_error = 0
+            return np.asarray(serial_interval)
+
+        serial_interval, self.si_truncation_error = compact_serial_interval(
+            serial_interval, self._si_tolerance)
+        return serial_interval
+
     def set_r_profile(self, new_rs, start_times, last_time=None):
         """
         Creates a new R_t profile for the model.
@@ -191,7 +213,7 @@ class BranchProModel(ForwardModel):
                 'Chosen times storage format must be 1-dimensional')
 
         # Invert order of serial intervals for ease in _effective_no_infectives
-        self._serial_interval = np.asarray(serial_intervals)[::-1]
+        self._serial_interval = self._compact(serial_intervals)[::-1]
         self._normalizing_const = np.sum(self._serial_interval)
 
     def _effective_no_infectives(self, t, incidences):
@@ -308,10 +330,14 @@ class LocImpBranchProModel(BranchProModel):
     epsilon
         (numeric) Proportionality constant of the R number for imported cases
         with respect to its analog for local ones.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of the serial interval
+        removed from its tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`.
 
     """
-    def __init__(self, initial_r, serial_interval, epsilon):
-        super().__init__(initial_r, serial_interval)
+    def __init__(self, initial_r, serial_interval, epsilon, si_tolerance=None):
+        super().__init__(initial_r, serial_interval, si_tolerance)
 
         self.set_epsilon(epsilon)
 
@@ -0,0 +1,260 @@
+#
+# MultiRegionBranchProPosterior Class
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import numpy as np
+import pandas as pd
+import scipy.special
+import scipy.stats
+
+from branchpro.posterior import (
+    BranchProPosterior, _renewal_infectiousness, _window_sums)
+from branchpro.serial_interval import compact_serial_interval
+
+
+class MultiRegionBranchProPosterior(object):
+    r"""MultiRegionBranchProPosterior Class:
+    Class for computing the posterior distributions used for the inference of
+    the reproduction numbers of epidemics in several regions at once, in the
+    case of a branching process with local and, optionally, imported cases.
+
+    The posterior of each region is the one of a :class:`BranchProPosterior`
+    (or of a :class:`LocImpBranchProPosterior` if imported cases are given),
+    with a conjugate Gamma prior shared by all regions:
+
+    .. math::
+        f(x) = \frac{\beta^\alpha}{\Gamma(\alpha)} x^{\alpha-1} e^{-\beta x}
+
+    The incidence numbers of all regions are stored in a single matrix, so
+    that the infectiousness and the sliding window sums of every region are
+    computed in one vectorised pass, without padding each series in a
+    dataframe.
+
+    Parameters
+    ----------
+    inc_data
+        (2D numpy array) numbers of local new cases of shape
+        ``(n_regions, n_times)``, for consecutive time units (usually days)
+        including zeros.
+    daily_serial_interval
+        (list or numpy array) Unnormalised probability distribution of that
+        the recipient first displays symptoms s days after the infector first
+        displays symptoms, shared by all regions; or 2-dimensional array of
+        shape ``(n_regions, n_serial)`` of such distributions, one per region.
+    alpha
+        the shape parameter of the Gamma distribution of the prior.
+    beta
+        the rate parameter of the Gamma distribution of the prior.
+    imported_inc_data
+        (2D numpy array) Optional numbers of imported new cases, of the same
+        shape as inc_data.
+    epsilon
+        (numeric) Proportionality constant of the R number for imported cases
+        with respect to its analog for local ones.
+    times
+        Optional times of the columns of inc_data; defaults to
+        ``0, 1, ..., n_times-1``. Must be consecutive.
+    regions
+        Optional labels of the rows of inc_data; defaults to
+        ``0, 1, ..., n_regions-1``.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of the serial
+        interval(s) removed from their tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`. The removed fraction is stored in
+        ``si_truncation_error``.
+
+    Notes
+    -----
+    Always apply method run_inference before calling
+    :meth:`MultiRegionBranchProPosterior.get_intervals` to get R behaviour
+    dataframe!
+    """
+    fft_threshold = BranchProPosterior.fft_threshold
+
+    def __init__(
+            self, inc_data, daily_serial_interval, alpha, beta,
+            imported_inc_data=None, epsilon=0, times=None, regions=None,
+            si_tolerance=None):
+
+        inc_data = np.asarray(inc_data, dtype=float)
+        if inc_data.ndim != 2:
+            raise ValueError(
+                'Incidence data storage format must be 2-dimensional')
+
+        if imported_inc_data is not None:
+            imported_inc_data = np.asarray(imported_inc_data, dtype=float)
+            if imported_inc_data.shape != inc_data.shape:
+                raise ValueError(
+                    'Imported incidence data must match the shape of the '
+                    'local incidence data')
+
+        num_regions, num_times = inc_data.shape
+
+        if times is None:
+            times = np.arange(num_times)
+        times = np.asarray(times)
+        if times.shape != (num_times,):
+            raise ValueError('Times must match the number of data columns')
+        if np.any(np.diff(times) != 1):
+            raise ValueError('Times must be consecutive')
+
+        if regions is None:
+            regions = np.arange(num_regions)
+        if len(regions) != num_regions:
+            raise ValueError('Regions must match the number of data rows')
+
+        serial_interval = np.asarray(daily_serial_interval, dtype=float)
+        if serial_interval.ndim not in (1, 2) or (
+                serial_interval.ndim == 2 and (
+                    serial_interval.shape[0] != num_regions)):
+            raise ValueError(
+                'Serial interval must be 1-dimensional or have one row per '
+                'region')
+
+        if si_tolerance is None:
+            self.si_truncation_error = 0
+        else:
+            serial_interval, self.si_truncation_error = (
+                compact_serial_interval(serial_interval, si_tolerance))
+
+        self.cases_data = inc_data
+        self.imp_cases_data = imported_inc_data
+        self.cases_times = times
+        self.regions = list(regions)
+        self._serial_interval = serial_interval
+        self.prior_parameters = (alpha, beta)
+        self.set_epsilon(epsilon)
+
+    def set_epsilon(self, new_epsilon):
+        """
+        Updates proportionality constant of the R number for imported cases
+        with respect to its analog for local ones.
+
+        Parameters
+        ----------
+        new_epsilon
+            new value of constant of proportionality.
+
+        """
+        if not isinstance(new_epsilon, (int, float)):
+            raise TypeError('Value of epsilon must be integer or float.')
+        if new_epsilon < -1:
+            raise ValueError('Epsilon needs to be greater or equal to -1.')
+
+        self.epsilon = new_epsilon
+
+    def get_serial_intervals(self):
+        """
+        Returns serial intervals for the model.
+
+        """
+        return self._serial_interval
+
+    def _infectiousness(self, cases_data):
+        """
+        Computes the expected number of new cases at every time point of every
+        region, using previous incidences and serial intervals.
+
+        The first time point has no previous incidences and is set to 0.
+        Serial intervals of at least ``fft_threshold`` values are convolved by
+        FFT, as for :meth:`BranchProPosterior._infectiousness`.
+
+        Parameters
+        ----------
+        cases_data
+            (2D numpy array) contains numbers of cases occuring in each time
+            unit (usually days) of each region, including zeros.
+        """
+        serial_interval = np.atleast_2d(self._serial_interval)
+        serial_interval = serial_interval / np.sum(
+            serial_interval, axis=1, keepdims=True)
+        return _renewal_infectiousness(
+            serial_interval, cases_data, self.fft_threshold)
+
+    def _window_sums(self, values, tau):
+        """
+        Sums the values of every region over every sliding time window of
+        size tau used in the inference.
+
+        The windows span the time points ``time - tau, ..., time`` for every
+        inference time, starting at the immediate time point after which the
+        first tau-window ends; see :meth:`BranchProPosterior._window_sums`.
+        """
+        cumulative = np.cumsum(np.pad(values, ((0, 0), (1, 0))), axis=1)
+        return _window_sums(cumulative, tau)
+
+    def run_inference(self, tau):
+        """
+        Runs the inference of the reproduction numbers of all regions based on
+        the entirety of the incidence data available.
+
+        First inferred R value is given at the immediate time point after which
+        the tau-window of the initial incidences ends.
+
+        Parameters
+        ----------
+        tau
+            size sliding time window over which the reproduction number is
+            estimated.
+        """
+        alpha, beta = self.prior_parameters
+
+        # compute shape parameter of the posterior over time
+        shape = alpha + self._window_sums(self.cases_data, tau)
+
+        # compute rate parameter of the posterior over time
+        rate = beta + self._window_sums(
+            self._infectiousness(self.cases_data), tau)
+        if self.imp_cases_data is not None:
+            rate += (1 + self.epsilon) * self._window_sums(
+                self._infectiousness(self.imp_cases_data), tau)
+
+        self.inference_times = list(self.cases_times[(tau + 1):])
+        self.inference_estimates = np.divide(shape, rate)
+        self.inference_posterior = scipy.stats.gamma(shape, scale=1/rate)
+
+    def get_intervals(self, central_prob):
+        """
+        Returns a dataframe of the reproduction number posterior mean
+        with percentiles over time for every region.
+
+        The lower and upper percentiles are computed from the posterior
+        distribution, using the specified central probability to form an
+        equal-tailed interval, by the inverse of the regularised incomplete
+        gamma function.
+
+        The results are returned in a dataframe with one row per region and
+        time point, and the following columns: 'Region', 'Time Points',
+        'Mean', 'Lower bound CI' and 'Upper bound CI'
+
+        Parameters
+        ----------
+        central_prob
+            level of the computed credible interval of the estimated
+            R number values. The interval the central probability.
+        """
+        # compute bounds of credible interval of level central_prob
+        probs = np.array([1 - central_prob, 1 + central_prob]) / 2
+        post_dist_interval = scipy.special.gammaincinv(
+            self.inference_posterior.args[0],
+            probs[:, np.newaxis, np.newaxis]) * (
+                self.inference_posterior.kwds['scale'])
+        num_regions, num_times = self.inference_estimates.shape
+
+        intervals_df = pd.DataFrame(
+            {
+                'Region': np.repeat(self.regions, num_times),
+                'Time Points': np.tile(self.inference_times, num_regions),
+                'Mean': self.inference_estimates.ravel(),
+                'Lower bound CI': post_dist_interval[0].ravel(),
+                'Upper bound CI': post_dist_interval[1].ravel(),
+                'Central Probability': central_prob
+            }
+        )
+
+        return intervals_df
@@ -0,0 +1,254 @@
+#
+# BranchProParticleFilter Class
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import numpy as np
+import pandas as pd
+import scipy.special
+
+from branchpro import BranchProPosterior
+
+
+class BranchProParticleFilter(BranchProPosterior):
+    r"""BranchProParticleFilter Class:
+    Class for the sequential Monte Carlo inference of the reproduction
+    numbers of an epidemic in the case of a branching process, using a
+    bootstrap particle filter. Based on the :class:`BranchProPosterior`.
+
+    Instead of assuming R_t constant over a sliding window, the logarithm of
+    the reproduction number follows a Gaussian random walk:
+
+    .. math::
+        \log R_{t} = \log R_{t-1} + \sigma \eta_{t}, \quad
+        \eta_{t} \sim N(0, 1)
+
+    and each day the particles are weighted by the Poisson likelihood of the
+    renewal equation
+
+    .. math::
+        I_{t} \sim \text{Pois}\left(R_{t}\sum_{s=1}^{t}I_{t-s}w_{s}\right)
+
+    and resampled systematically.
+
+    Parameters
+    ----------
+    inc_data
+        (pandas Dataframe) contains numbers of new cases by time unit (usually
+        days).
+        Data stored in columns of with one for time and one for incidence
+        number, respectively. Alternatively, (1D numpy array) numbers of new
+        cases at consecutive time units including zeros, starting at
+        ``time_start``.
+    daily_serial_interval
+        (list) Unnormalised probability distribution of that the recipient
+        first displays symptoms s days after the infector first displays
+        symptoms.
+    alpha
+        the shape parameter of the Gamma distribution of the initial
+        reproduction number.
+    beta
+        the rate parameter of the Gamma distribution of the initial
+        reproduction number.
+    sigma
+        standard deviation of the daily step of the random walk of the
+        logarithm of the reproduction number.
+    time_key
+        label key given to the temporal data in the inc_data dataframe.
+    inc_key
+        label key given to the incidental data in the inc_data dataframe.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of the serial interval
+        removed from its tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`.
+    time_start
+        (int) time of the first incidence number when inc_data is a numpy
+        array; defaults to 0.
+
+    Notes
+    -----
+    Always apply method run_inference before calling
+    :meth:`BranchProParticleFilter.get_intervals` to get R behaviour
+    dataframe!
+    """
+    def __init__(
+            self, inc_data, daily_serial_interval, alpha, beta, sigma=0.1,
+            time_key='Time', inc_key='Incidence Number', si_tolerance=None,
+            time_start=None):
+
+        super().__init__(
+            inc_data, daily_serial_interval, alpha, beta, time_key, inc_key,
+            si_tolerance, time_start)
+
+        if sigma < 0:
+            raise ValueError('Random walk step size must be non-negative.')
+
+        self.sigma = sigma
+
+    def run_inference(self, num_particles=1000):
+        """
+        Runs the particle filter inference of the reproduction numbers based
+        on the entirety of the incidence data available.
+
+        First inferred R value is given at the second time point of the
+        incidence data.
+
+        The estimate of the log-likelihood of the model, i.e. of the
+        incidences after the first time point given the ones before them,
+        with R integrated over its random walk, is stored in
+        ``log_likelihood``. It is the sum over time points of the log of the
+        mean Poisson probability of the incidence number under the
+        particles. It is -inf if a positive incidence number follows time
+        points with no infectiousness, which the model cannot produce.
+
+        Parameters
+        ----------
+        num_particles
+            (int) number of particles used to represent the distribution of
+            the reproduction number at each time point.
+        """
+        alpha, beta = self.prior_parameters
+        infectiousness = self._infectiousness(self.cases_data)[1:]
+        observed = self.cases_data[1:]
+        num_times = len(observed)
+
+        particles = np.empty((num_times, num_particles))
+        ancestors = np.empty((num_times, num_particles), dtype=int)
+        offsets = np.arange(num_particles) / num_particles
+        log_likelihood = 0
+
+        log_r = np.log(np.random.gamma(alpha, 1/beta, size=num_particles))
+        identity = np.arange(num_particles)
+
+        for t in range(num_times):
+            # propagate the particles through the random walk
+            if t > 0:
+                log_r = log_r + self.sigma * np.random.normal(
+                    size=num_particles)
+
+            # weight the particles by the Poisson likelihood
+            lam = infectiousness[t]
+            if lam > 0:
+                log_weights = observed[t] * (log_r + np.log(lam)) - (
+                    np.exp(log_r) * lam)
+                max_log_weight = np.max(log_weights)
+                weights = np.exp(log_weights - max_log_weight)
+                sum_weights = np.sum(weights)
+                log_likelihood += max_log_weight + np.log(
+                    sum_weights / num_particles) - scipy.special.gammaln(
+                        observed[t] + 1)
+
+                # systematic resampling
+                positions = offsets + np.random.uniform() / num_particles
+                indices = np.minimum(np.searchsorted(
+                    np.cumsum(weights) / sum_weights, positions),
+                    num_particles - 1)
+                log_r = log_r[indices]
+            else:
+                # no new cases are possible; the particles are not weighted
+                if observed[t] > 0:
+                    log_likelihood = -np.inf
+                indices = identity
+
+            particles[t] = log_r
+            ancestors[t] = indices
+
+        self.inference_times = list(range(
+            self.cases_times.min()+1, self.cases_times.max()+1))
+        self.log_likelihood = log_likelihood
+        self._filtered_particles = np.exp(particles)
+        self._ancestors = ancestors
+
+    def run_inference_multi_tau(self, taus):
+        """
+        Raises a ValueError, as the particle filter has no sliding time
+        window; neither have the predictive scores and choice of window built
+        on it (:meth:`log_predictive_likelihood` and :meth:`select_tau`).
+
+        """
+        raise ValueError(
+            'The particle filter does not use a sliding time window.')
+
+    def get_predictive_intervals(self, central_prob):
+        """
+        Raises a ValueError, as the posterior predictive distributions are
+        computed from the Gamma-shaped posterior of a sliding time window.
+
+        """
+        raise ValueError(
+            'Predictive intervals are not supported by the particle filter.')
+
+    def append(self, time, count):
+        """
+        Raises a ValueError, as the filtered particles cannot be extended
+        with new data; the inference must be run again on the extended data
+        instead.
+
+        """
+        raise ValueError(
+            'Appending data is not supported by the particle filter.')
+
+    def _smoothed_particles(self):
+        """
+        Traces the genealogy of the final particles back in time to obtain
+        samples from the smoothed distribution of the R_t trajectory.
+        """
+        num_times, num_particles = self._filtered_particles.shape
+        smoothed = np.empty_like(self._filtered_particles)
+        lineage = np.arange(num_particles)
+
+        for t in range(num_times - 1, -1, -1):
+            smoothed[t] = self._filtered_particles[t, lineage]
+            lineage = self._ancestors[t, lineage]
+
+        return smoothed
+
+    def get_intervals(self, central_prob, smoothed=False):
+        """
+        Returns a dataframe of the reproduction number posterior mean
+        with percentiles over time.
+
+        The lower and upper percentiles are computed from the particles,
+        using the specified central probability to form an equal-tailed
+        interval.
+
+        The results are returned in a dataframe with the following columns:
+        'Time Points', 'Mean', 'Lower bound CI' and 'Upper bound CI'
+
+        Parameters
+        ----------
+        central_prob
+            level of the computed credible interval of the estimated
+            R number values. The interval the central probability.
+        smoothed
+            (bool) if True, the intervals use all the incidence data
+            available at each time point (smoothing) rather than only the
+            data up to it (filtering).
+        """
+        if smoothed:
+            samples = self._smoothed_particles()
+        else:
+            samples = self._filtered_particles
+
+        # compute mean and bounds of credible interval of level central_prob
+        self.inference_estimates = np.mean(samples, axis=1)
+        lb = 100*(1-central_prob)/2
+        ub = 100*(1+central_prob)/2
+        post_dist_interval = np.percentile(
+            samples, q=np.array([lb, ub]), axis=1)
+
+        intervals_df = pd.DataFrame(
+            {
+                'Time Points': self.inference_times,
+                'Mean': self.inference_estimates,
+                'Lower bound CI': post_dist_interval[0],
+                'Upper bound CI': post_dist_interval[1],
+                'Central Probability': central_prob
+            }
+        )
+
+        return intervals_df
@@ -7,10 +7,446 @@
 # notice and full license details.
 #
 
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from multiprocessing import shared_memory
+
 import numpy as np
 import pandas as pd
+import scipy.signal
+import scipy.special
 import scipy.stats
 
+from branchpro.inference_result import InferenceResult
+from branchpro.serial_interval import compact_serial_interval
+
+
+def _gamma_mixture_cdf(shape, rates, x, approximate=False, weights=None):
+    """
+    Returns the CDF and PDF at x of mixtures of Gamma distributions sharing
+    their shape parameter, with components along the first axis of
+    ``rates`` and equal weights unless ``weights`` of the same shape are
+    given.
+
+    If ``approximate`` is True, the CDF of the components is evaluated by the
+    Wilson-Hilferty normal approximation, which is much cheaper for large
+    shape parameters.
+    """
+    scaled = rates * x
+    if approximate:
+        cube_root = np.cbrt(scaled / shape)
+        scale = np.sqrt(9 * shape)
+        z = (cube_root - 1 + 1 / (9 * shape)) * scale
+        cdf = scipy.special.ndtr(z)
+        pdf = np.exp(-z ** 2 / 2) / np.sqrt(2 * np.pi) * (
+            scale * cube_root / (3 * x))
+    else:
+        cdf = scipy.special.gammainc(shape, scaled)
+        pdf = np.exp(
+            shape * np.log(rates) + (shape - 1) * np.log(x) - scaled -
+            scipy.special.gammaln(shape))
+
+    if weights is None:
+        return np.mean(cdf, axis=0), np.mean(pdf, axis=0)
+    return np.sum(weights * cdf, axis=0), np.sum(weights * pdf, axis=0)
+
+
+def _gamma_mixture_quantiles(
+        shape, rates, probs, weights=None, rtol=1e-8, max_iter=100):
+    """
+    Returns the quantiles of mixtures of Gamma distributions sharing their
+    shape parameter, at every time point.
+
+    The quantile of the mixture lies between the quantiles of its
+    components. It is found by Newton iterations on the mixture CDF, falling
+    back to bisection of that bracket when a step leaves it, vectorised over
+    the probabilities and time points. The iterations start from the
+    quantile of the quantiles of the components and first run on the
+    Wilson-Hilferty approximation of the CDF, then on the exact CDF; only
+    the values which have not converged are updated.
+
+    Parameters
+    ----------
+    shape
+        (1D numpy array) shape parameters of the components at each time
+        point.
+    rates
+        (2D numpy array) rate parameters of the components at each time
+        point, of shape ``(n_components, n_times)``.
+    probs
+        (1D numpy array) probabilities of the quantiles.
+    weights
+        (2D numpy array) Optional weights of the components at each time
+        point, of the same shape as ``rates`` and summing to 1 over the
+        components; if None, the components have equal weights.
+
+    Returns
+    -------
+    (numpy array) quantiles of shape ``(len(probs), n_times)``.
+    """
+    probs = np.asarray(probs, dtype=float)
+    num_times = len(shape)
+
+    components = scipy.special.gammaincinv(
+        shape, probs[:, np.newaxis])[:, np.newaxis, :] / rates
+    bracket = np.min(components, axis=1).ravel(), np.max(
+        components, axis=1).ravel()
+    with np.errstate(invalid='ignore'):
+        x = np.concatenate([
+            np.quantile(component, prob, axis=0)
+            for component, prob in zip(components, probs)])
+    x = np.where(bracket[0] < bracket[1], x, bracket[0])
+
+    # flatten the probabilities and time points
+    shape = np.tile(shape, len(probs))
+    rates = np.tile(rates, (1, len(probs)))
+    if weights is not None:
+        weights = np.tile(weights, (1, len(probs)))
+    probs = np.repeat(probs, num_times)
+
+    for approximate in [True, False]:
+        lower, upper = bracket[0].copy(), bracket[1].copy()
+        active = np.flatnonzero(lower < upper)
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            current = x[active]
+            cdf, pdf = _gamma_mixture_cdf(
+                shape[active], rates[:, active], current, approximate,
+                None if weights is None else weights[:, active])
+            diff = cdf - probs[active]
+            lower[active] = np.where(diff < 0, current, lower[active])
+            upper[active] = np.where(diff > 0, current, upper[active])
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = current - diff / pdf
+            x[active] = np.where(
+                (newton > lower[active]) & (newton < upper[active]), newton,
+                (lower[active] + upper[active]) / 2)
+
+            active = active[~(np.abs(x[active] - current) <= rtol * current)]
+
+    return x.reshape(-1, num_times)
+
+
+def _nbinom_mixture_quantiles(shape, success, weights, probs):
+    """
+    Returns the quantiles of mixtures of negative binomial distributions at
+    every time point.
+
+    The quantile of the mixture lies between the quantiles of its
+    components; it is found by bisection of the counts of that bracket,
+    vectorised over the probabilities and time points.
+
+    Parameters
+    ----------
+    shape
+        (numpy array) numbers of successes of the components, broadcasting
+        against ``success``.
+    success
+        (2D numpy array) probabilities of success of the components at each
+        time point, of shape ``(n_components, n_times)``.
+    weights
+        (2D numpy array) weights of the components at each time point, of
+        the same shape as ``success`` and summing to 1 over the components.
+    probs
+        (1D numpy array) probabilities of the quantiles.
+
+    Returns
+    -------
+    (numpy array) quantiles of shape ``(len(probs), n_times)``.
+    """
+    probs = np.asarray(probs, dtype=float)[:, np.newaxis]
+    components = scipy.stats.nbinom.ppf(
+        probs[:, np.newaxis], shape, success)
+
+    # the CDF of the mixture is below the probability at lower and reaches
+    # it at upper
+    lower = np.min(components, axis=1) - 1
+    upper = np.max(components, axis=1)
+    while np.any(upper - lower > 1):
+        middle = np.floor((lower + upper) / 2)
+        cdf = np.sum(weights * scipy.stats.nbinom.cdf(
+            middle[:, np.newaxis], shape, success), axis=1)
+        below = cdf < probs
+        lower = np.where(below, middle, lower)
+        upper = np.where(below, upper, middle)
+
+    return upper
+
+
+def _last_infectiousness(serial_intervals, cases_data):
+    """
+    Returns the expected number of new cases at the time point following a
+    data array, for several normalised serial intervals in reversed order, of
+    shape ``(n_serial_intervals, n_serial)``.
+    """
+    num_serial = serial_intervals.shape[1]
+    return serial_intervals @ np.append(
+        np.zeros(num_serial), cases_data)[-num_serial:]
+
+
+def _partition_percentiles(samples, probs):
+    """
+    Returns the percentiles of samples along their first axis, with the
+    linear interpolation of :func:`numpy.percentile`, using a partial sort
+    which only places the order statistics needed.
+
+    Parameters
+    ----------
+    samples
+        (2D numpy array) samples of shape ``(n_samples, n_times)``; it is
+        partitioned in place.
+    probs
+        (1D numpy array) probabilities of the percentiles.
+
+    Returns
+    -------
+    (numpy array) percentiles of shape ``(len(probs), n_times)``.
+    """
+    position = np.asarray(probs, dtype=float) * (len(samples) - 1)
+    below = np.floor(position).astype(int)
+    above = np.ceil(position).astype(int)
+
+    samples.partition(np.unique(np.append(below, above)), axis=0)
+
+    weight = (position - below)[:, np.newaxis]
+    return (1 - weight) * samples[below] + weight * samples[above]
+
+
+def _window_sums(cumulative, tau):
+    """
+    Sums series over every sliding time window of size tau used in the
+    inference, from their cumulative sums along the last axis; see
+    :meth:`BranchProPosterior._window_sums`.
+    """
+    num_windows = max(cumulative.shape[-1] - tau - 2, 0)
+    return cumulative[..., (tau + 2):(tau + 2 + num_windows)] - (
+        cumulative[..., 1:(1 + num_windows)])
+
+
+def _grown(buffers, name, array, values):
+    """
+    Returns an array with values appended along its last axis, written in
+    place after it in its buffer when there is room.
+
+    The buffers of the arrays are kept by name. An array that is not the
+    start of the buffer of its name, e.g. the first time it is grown, is
+    copied into a new buffer of twice its new length, so that growing an
+    array repeatedly takes an amortised time proportional to the number of
+    appended values only. Arrays returned earlier are left unchanged, as
+    values are only written past their end.
+
+    Parameters
+    ----------
+    buffers
+        (dict) buffers of the arrays by name, updated in place.
+    name
+        name of the array.
+    array
+        (numpy array) array to append to.
+    values
+        (numpy array) values to append, broadcast against the array but for
+        its last axis.
+    """
+    values = np.asarray(values)
+    length = array.shape[-1]
+    new_length = length + values.shape[-1]
+
+    buffer = buffers.get(name)
+    if (buffer is None) or (array.base is not buffer) or (
+            array.ctypes.data != buffer.ctypes.data) or (
+            array.strides != buffer.strides) or (
+            buffer.shape[-1] < new_length) or (
+            buffer.dtype != np.result_type(array, values)):
+        buffer = np.empty(
+            array.shape[:-1] + (2 * new_length,),
+            dtype=np.result_type(array, values))
+        buffer[..., :length] = array
+        buffers[name] = buffer
+
+    buffer[..., length:new_length] = values
+    return buffer[..., :new_length]
+
+
+def _renewal_infectiousness(serial_interval, cases_data, fft_threshold):
+    """
+    Returns the infectiousness of incidence series along their last axis,
+    the sums of the incidences preceding each time point weighted by the
+    serial interval(s); the first time point has no previous incidences and
+    is set to 0.
+
+    Serial intervals of at least ``fft_threshold`` values are convolved by
+    FFT; otherwise series are convolved directly, or by summing over the
+    serial interval for several series at once.
+
+    Parameters
+    ----------
+    serial_interval
+        (numpy array) normalised serial interval(s) along the last axis,
+        with as many dimensions as cases_data and broadcast against it.
+    cases_data
+        (numpy array) numbers of cases occuring in each time unit (usually
+        days) including zeros, along the last axis.
+    fft_threshold
+        (int) length of the serial interval from which the infectiousness is
+        computed by FFT.
+    """
+    num_serial, num_times = serial_interval.shape[-1], cases_data.shape[-1]
+    infectiousness = np.zeros(np.broadcast_shapes(
+        serial_interval.shape[:-1], cases_data.shape[:-1]) + (num_times,))
+
+    if min(num_serial, num_times) >= fft_threshold:
+        # FFT round-off can give tiny negative values
+        infectiousness[..., 1:] = np.maximum(scipy.signal.fftconvolve(
+            cases_data, serial_interval, axes=-1)[..., :(num_times - 1)], 0)
+    elif cases_data.ndim == 1:
+        infectiousness[1:] = np.convolve(
+            cases_data, serial_interval)[:(num_times - 1)]
+    else:
+        # Sum over the serial interval, each term for all series and time
+        # points at once
+        for s in range(min(num_serial, num_times - 1)):
+            infectiousness[..., (s + 1):] += (
+                serial_interval[..., s:(s + 1)] *
+                cases_data[..., :(num_times - s - 1)])
+
+    return infectiousness
+
+
+def _multi_infectiousness_sums(serial_intervals, cases_data):
+    """
+    Returns the cumulative sums, starting at 0, of the infectiousness of a
+    data array for several serial intervals, of shape
+    ``(n_serial_intervals, n_times + 1)``.
+
+    The infectiousness of all serial intervals is computed as a single
+    product of the matrix of the normalised serial intervals with the matrix
+    of the incidences preceding each time point.
+
+    Parameters
+    ----------
+    serial_intervals
+        (2D numpy array) normalised serial intervals, in reversed order, of
+        shape ``(n_serial_intervals, n_serial)``.
+    cases_data
+        (1D numpy array) contains numbers of cases occuring in each time
+        unit (usually days) including zeros.
+    """
+    # incidences of the num_serial time points preceding each time point
+    num_times = len(cases_data)
+    num_serial = serial_intervals.shape[1]
+    padded = np.append(np.zeros(num_serial), cases_data)
+    previous = padded[
+        np.arange(num_times)[:, np.newaxis] + np.arange(num_serial)]
+
+    cumulative = np.zeros((len(serial_intervals), num_times + 1))
+    np.cumsum((previous @ serial_intervals.T).T, axis=1, out=cumulative[:, 1:])
+    return cumulative
+
+
+def _sampled_mixture_summaries(
+        shape, rates, probs, num_samples, rng, max_chunk_draws):
+    """
+    Returns the mean and percentiles of equal-weight mixtures of Gamma
+    distributions sharing their shape parameter, estimated from
+    ``num_samples`` draws of each component, generated and reduced in chunks
+    of time points so that at most ``max_chunk_draws`` draws are held in
+    memory at once.
+
+    Parameters
+    ----------
+    shape
+        (1D numpy array) shape parameters of the components at each time
+        point.
+    rates
+        (2D numpy array) rate parameters of the components at each time
+        point, of shape ``(n_components, n_times)``.
+    probs
+        (1D numpy array) probabilities of the percentiles.
+    num_samples
+        (int) number of draws of each component.
+    rng
+        (numpy.random.Generator) generator of the draws.
+    max_chunk_draws
+        (int) maximum number of draws held in memory at once.
+    """
+    num_draws = len(rates) * num_samples
+    chunk_size = max(max_chunk_draws // num_draws, 1)
+
+    mean = np.empty(len(shape))
+    percentiles = np.empty((len(probs), len(shape)))
+    for start in range(0, len(shape), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        samples = rng.gamma(
+            shape[chunk], 1 / rates[:, np.newaxis, chunk],
+            size=(len(rates), num_samples, len(shape[chunk])))
+        samples = samples.reshape(num_draws, -1)
+
+        mean[chunk] = np.mean(samples, axis=0)
+        percentiles[:, chunk] = _partition_percentiles(samples, probs)
+
+    return mean, percentiles
+
+
+def _share(array):
+    """
+    Copies an array to a new block of shared memory, and returns the block
+    and the description of the array used by :func:`_attach`.
+    """
+    array = np.ascontiguousarray(array, dtype=float)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape)
+
+
+def _attach(description):
+    """
+    Returns a block of shared memory created by :func:`_share` and the
+    array it holds.
+    """
+    name, array_shape = description
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(array_shape, buffer=block.buf)
+
+
+def _rates_worker(serial_intervals, rate_data, coefficients, tau, rows):
+    """
+    Returns the window sums of the rate of the posterior for a block of rows
+    of the normalised serial intervals, reading the serial intervals and the
+    data arrays from shared memory.
+    """
+    si_block, serial_intervals = _attach(serial_intervals)
+    data_block, rate_data = _attach(rate_data)
+    try:
+        return sum(
+            coefficient * _window_sums(_multi_infectiousness_sums(
+                serial_intervals[rows], data), tau)
+            for coefficient, data in zip(coefficients, rate_data))
+    finally:
+        si_block.close()
+        data_block.close()
+
+
+def _summaries_worker(
+        shape, rates, probs, num_samples, seed, max_chunk_draws, times):
+    """
+    Returns the mean and percentiles of the posterior at a block of time
+    points, reading the rates of the posterior from shared memory; see
+    :meth:`BranchProPosteriorMultSI.get_intervals`.
+    """
+    rates_block, rates = _attach(rates)
+    try:
+        if num_samples is None:
+            return (
+                np.mean(shape[times] / rates[:, times], axis=0),
+                _gamma_mixture_quantiles(shape[times], rates[:, times], probs))
+        return _sampled_mixture_summaries(
+            shape[times], rates[:, times], probs, num_samples,
+            np.random.default_rng(seed), max_chunk_draws)
+    finally:
+        rates_block.close()
+
 
 class BranchProPosterior(object):
     r"""BranchProPosterior Class:
@@ -33,58 +469,111 @@ class BranchProPosterior(object):
         (pandas Dataframe) contains numbers of new cases by time unit (usually
         days).
         Data stored in columns of with one for time and one for incidence
-        number, respectively.
+        number, respectively. Alternatively, (1D numpy array) numbers of new
+        cases at consecutive time units including zeros, starting at
+        ``time_start``, which is used without padding or copying; changes
+        made to it in place are detected by the next inference.
     daily_serial_interval
         (list) Unnormalised probability distribution of that the recipient
         first displays symptoms s days after the infector first displays
         symptoms.
     alpha
-        the shape parameter of the Gamma distribution of the prior.
+        the shape parameter of the Gamma distribution of the prior; an array
+        of values gives a grid of priors, see :meth:`run_inference`.
     beta
-        the rate parameter of the Gamma distribution of the prior.
+        the rate parameter of the Gamma distribution of the prior; an array
+        of values gives a grid of priors, see :meth:`run_inference`.
     time_key
         label key given to the temporal data in the inc_data dataframe.
     inc_key
         label key given to the incidental data in the inc_data dataframe.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of the serial interval
+        removed from its tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`. The removed fraction is stored in
+        ``si_truncation_error``.
+    time_start
+        (int) time of the first incidence number when inc_data is a numpy
+        array; defaults to 0.
 
     Notes
     -----
     Always apply method run_inference before calling
     :meth:`BranchProPosterior.get_intervals` to get R behaviour dataframe!
     """
+    # Length of the serial interval from which the infectiousness is computed
+    # by FFT rather than direct convolution
+    fft_threshold = 300
 
     def __init__(
             self, inc_data, daily_serial_interval, alpha, beta,
-            time_key='Time', inc_key='Incidence Number'):
+            time_key='Time', inc_key='Incidence Number', si_tolerance=None,
+            time_start=None):
 
-        if not issubclass(type(inc_data), pd.DataFrame):
-            raise TypeError('Incidence data has to be a dataframe')
+        if isinstance(inc_data, np.ndarray):
+            if inc_data.ndim != 1:
+                raise ValueError(
+                    'Incidence data storage format must be 1-dimensional')
 
-        self._check_serial(daily_serial_interval)
+            self._check_serial(daily_serial_interval)
 
-        if time_key not in inc_data.columns:
-            raise ValueError('No time column with this name in given data')
+            if time_start is None:
+                time_start = 0
 
-        if inc_key not in inc_data.columns:
-            raise ValueError(
-                'No incidence column with this name in given data')
+            self.cases_labels = [time_key, inc_key]
+            self.cases_data = inc_data
+            self.cases_times = np.arange(
+                time_start, time_start + len(inc_data))
+
+        else:
+            if not issubclass(type(inc_data), pd.DataFrame):
+                raise TypeError(
+                    'Incidence data has to be a dataframe or a numpy array')
 
-        data_times = inc_data[time_key]
+            self._check_serial(daily_serial_interval)
 
-        # Pad with zeros the time points where we have no information on
-        # the number of incidences
-        padded_inc_data = inc_data.set_index(time_key).reindex(
-            range(
-                min(data_times), max(data_times)+1)
-                ).fillna(0).reset_index()
+            if time_key not in inc_data.columns:
+                raise ValueError(
+                    'No time column with this name in given data')
 
-        self.cases_labels = list(padded_inc_data[[time_key, inc_key]].columns)
-        self.cases_data = padded_inc_data[inc_key].to_numpy()
-        self.cases_times = padded_inc_data[time_key]
-        self._serial_interval = np.asarray(daily_serial_interval)[::-1]
+            if inc_key not in inc_data.columns:
+                raise ValueError(
+                    'No incidence column with this name in given data')
+
+            data_times = inc_data[time_key]
+
+            # Pad with zeros the time points where we have no information on
+            # the number of incidences
+            padded_inc_data = inc_data.set_index(time_key).reindex(
+                range(
+                    min(data_times), max(data_times)+1)
+                    ).fillna(0).reset_index()
+
+            self.cases_labels = list(
+                padded_inc_data[[time_key, inc_key]].columns)
+            self.cases_data = padded_inc_data[inc_key].to_numpy()
+            self.cases_times = padded_inc_data[time_key]
+
+        self._infectiousness_cache = {}
+        self._buffers = {}
+        self._si_tolerance = si_tolerance
+        self._serial_interval = self._compact(daily_serial_interval)[::-1]
         self._normalizing_const = np.sum(self._serial_interval)
         self.prior_parameters = (alpha, beta)
 
+    def _compact(self, serial_interval):
+        """
+        Trims the tail of the serial interval(s) to the tolerance of the
+        posterior, if one was given, and records the fraction of mass removed.
+        """
+        if self._si_tolerance is None:
+            self.si_truncation_error = 0
+            return np.asarray(serial_interval)
+
+        serial_interval, self.si_truncation_error = compact_serial_interval(
+            serial_interval, self._si_tolerance)
+        return serial_interval
+
     def _check_serial(self, si):
         """
         Checks serial interval is iterable and only contains numeric values.
@@ -123,8 +612,65 @@ class BranchProPosterior(object):
                 'Chosen times storage format must be 1-dimensional')
 
         # Invert order of serial intervals for ease in _effective_no_infectives
-        self._serial_interval = np.asarray(serial_intervals)[::-1]
+        self._serial_interval = self._compact(serial_intervals)[::-1]
         self._normalizing_const = np.sum(self._serial_interval)
+        self._infectiousness_cache.clear()
+
+    def set_prior_moments(self, mean, stdev):
+        """
+        Updates the parameters of the Gamma distribution of the prior from its
+        mean and standard deviation.
+
+        Arrays of values give a grid of priors, see :meth:`run_inference`.
+
+        Parameters
+        ----------
+        mean
+            mean of the prior distribution of the reproduction number.
+        stdev
+            standard deviation of the prior distribution of the
+            reproduction number.
+        """
+        mean = np.asarray(mean, dtype=float)
+        stdev = np.asarray(stdev, dtype=float)
+        if np.any(mean <= 0) or np.any(stdev <= 0):
+            raise ValueError(
+                'Prior mean and standard deviation must be positive.')
+
+        self.prior_parameters = ((mean / stdev) ** 2, mean / (stdev ** 2))
+
+    def _prior_grid(self, ndim):
+        """
+        Returns the parameters of the prior broadcast against each other, with
+        ``ndim`` trailing axes added so that they broadcast against window
+        sums with ``ndim`` dimensions.
+        """
+        new_axes = (Ellipsis,) + (np.newaxis,) * ndim
+        return tuple(
+            param[new_axes]
+            for param in np.broadcast_arrays(*self.prior_parameters))
+
+    def _check_scalar_prior(self, prior_parameters=None):
+        """
+        Checks the parameters of the prior, by default the current ones, are
+        single values.
+        """
+        if prior_parameters is None:
+            prior_parameters = self.prior_parameters
+        if any(np.ndim(param) > 0 for param in prior_parameters):
+            raise ValueError(
+                'Grids of priors are not supported for this posterior.')
+
+    def _inference_settings(self):
+        """
+        Returns the current settings of the posterior the results of an
+        inference depend on, besides the data and tau: the parameters of the
+        prior and the serial interval.
+        """
+        alpha, beta = self.prior_parameters
+        return {
+            'alpha': alpha, 'beta': beta,
+            'serial_interval': self._serial_interval}
 
     def _infectious_individuals(self, cases_data, t):
         """
@@ -151,26 +697,104 @@ class BranchProPosterior(object):
             self._normalizing_const)
         return eff_num
 
-    def _infectives_in_tau(self, cases_data, start, end):
+    def _infectiousness(self, cases_data):
+        """
+        Computes the expected number of new cases at every time point, using
+        previous incidences and serial intervals, by a single convolution.
+
+        The value at index ``t-1`` matches
+        ``_infectious_individuals(cases_data, t)``; the first time point has
+        no previous incidences and is set to 0.
+
+        Serial intervals of at least ``fft_threshold`` values are convolved by
+        FFT. The result is cached, see :meth:`_prefix_sums`.
+
+        Parameters
+        ----------
+        cases_data
+            (1D numpy array) contains numbers of cases occuring in each time
+            unit (usually days) including zeros.
+        """
+        return self._cached_sums(cases_data)[0]
+
+    def _prefix_sums(self, cases_data):
         """
-        Sum total number of infectives in tau window.
+        Returns the cumulative sums, starting at 0, of a data array and of its
+        infectiousness.
+
+        They depend only on the data and the serial interval, not on the prior
+        or tau, and are cached for the last serial interval used with each
+        data array (until :meth:`set_serial_intervals` is called, or the
+        values of the array are changed in place), so that re-running the
+        inference with a new prior or window only takes differences of them.
 
         Parameters
         ----------
         cases_data
             (1D numpy array) contains numbers of cases occuring in each time
             unit (usually days) including zeros.
-        start
-            start time of the time window in which to calculate effective
-            number of infectives.
-        end
-            end time of the time window in which to calculate effective number
-            of infectives.
-        """
-        num = []
-        for time in range(start, end):
-            num += [self._infectious_individuals(cases_data, time)]
-        return np.sum(num)
+        """
+        return self._cached_sums(cases_data)[1:]
+
+    def _cached_sums(self, cases_data):
+        """
+        Returns the infectiousness of a data array and the cumulative sums of
+        the data and of its infectiousness, from the cache if they were
+        computed for the same data array and serial interval.
+        """
+        cached = self._cached(
+            id(cases_data), cases_data, self._serial_interval)
+        if cached is not None:
+            return cached
+
+        infectiousness = _renewal_infectiousness(
+            self._serial_interval[::-1] / self._normalizing_const,
+            cases_data, self.fft_threshold)
+        sums = (
+            infectiousness,
+            np.cumsum(np.append(0, cases_data), dtype=float),
+            np.cumsum(np.append(0, infectiousness)))
+
+        self._infectiousness_cache[id(cases_data)] = (
+            cases_data, cases_data.copy(), self._serial_interval) + sums
+        return sums
+
+    def _cached(self, key, cases_data, serial_interval):
+        """
+        Returns the values cached under a key for a data array and serial
+        interval(s), or None if there are none or the values of the array
+        have changed since they were computed.
+
+        The entries hold the data array, a copy of its values, the serial
+        interval(s) and the cached values, so that arrays shared with the
+        caller and changed in place are not matched.
+        """
+        cached = self._infectiousness_cache.get(key)
+        if (cached is None) or (cached[0] is not cases_data) or (
+                cached[2] is not serial_interval) or not np.array_equal(
+                    cached[1], cases_data):
+            return None
+        return cached[3:]
+
+    def _window_sums(self, cumulative, tau):
+        """
+        Sums a series over every sliding time window of size tau used in the
+        inference, from its cumulative sums.
+
+        The windows span the time points ``time - tau, ..., time`` for every
+        inference time, starting at the immediate time point after which the
+        first tau-window ends.
+
+        Parameters
+        ----------
+        cumulative
+            (numpy array) cumulative sums along the last axis, starting at 0,
+            of the values at each time unit (usually days) of the data.
+        tau
+            size sliding time window over which the reproduction number is
+            estimated.
+        """
+        return _window_sums(cumulative, tau)
 
     def run_inference(self, tau):
         """
@@ -180,45 +804,396 @@ class BranchProPosterior(object):
         First inferred R value is given at the immediate time point after which
         the tau-window of the initial incidences ends.
 
+        If the prior parameters are arrays, they are broadcast against each
+        other and the posterior is computed for the whole grid of priors at
+        once: the posterior parameters have the broadcast shape of the prior
+        parameters followed by the time axis.
+
         Parameters
         ----------
         tau
             size sliding time window over which the reproduction number is
             estimated.
         """
-        total_time = self.cases_times.max() - self.cases_times.min() + 1
-        alpha, beta = self.prior_parameters
-        time_init_inf_r = tau + 1
-
-        shape = []
-        rate = []
-        mean = []
+        alpha, beta = self._prior_grid(1)
 
-        for time in range(time_init_inf_r+1, total_time+1):
-            # get cases in tau window
-            start_window = time - tau
-            end_window = time + 1
+        # compute shape parameter of the posterior over time
+        shape = alpha + self._window_sums(
+            self._prefix_sums(self.cases_data)[0], tau)
 
-            # compute shape parameter of the posterior over time
-            shape.append(
-                alpha + np.sum(
-                    self.cases_data[(start_window-1):(end_window-1)]))
-
-            # compute rate parameter of the posterior over time
-
-            rate.append(beta + self._infectives_in_tau(
-                self.cases_data, start_window, end_window))
+        # compute rate parameter of the posterior over time
+        rate = beta + sum(
+            coefficient * self._window_sums(cumulative, tau)
+            for coefficient, cumulative in self._rate_terms())
 
         # compute the mean of the Gamma-shaped posterior over time
         mean = np.divide(shape, rate)
 
         # compute the Gamma-shaped posterior distribution
-        post_dist = scipy.stats.gamma(shape, scale=1/np.array(rate))
+        post_dist = scipy.stats.gamma(shape, scale=1/rate)
 
         self.inference_times = list(range(
             self.cases_times.min()+1+tau, self.cases_times.max()+1))
         self.inference_estimates = mean
         self.inference_posterior = post_dist
+        self._tau = tau
+        self._inference_parameters = self._inference_settings()
+
+    def _inference_changed(self):
+        """
+        Returns whether the settings of the posterior have changed since the
+        last inference; see :meth:`_inference_settings`.
+        """
+        saved = self._inference_parameters
+        return any(
+            not np.array_equal(value, saved[key])
+            for key, value in self._inference_settings().items())
+
+    def run_inference_multi_tau(self, taus):
+        """
+        Runs the inference of the reproduction numbers for several sizes of
+        the sliding time window at once, from a single set of cumulative
+        sums.
+
+        The results share the time points of the smallest window: the first
+        one is the immediate time point after which the tau-window of the
+        initial incidences ends for the smallest tau. Time points before the
+        first inferred R value of a larger tau are filled with NaN.
+
+        Parameters
+        ----------
+        taus
+            sequence of sizes of the sliding time window over which the
+            reproduction number is estimated.
+
+        Returns
+        -------
+        tuple
+            The time points, of shape ``(n_times,)``, and the shape and rate
+            parameters of the Gamma-shaped posterior, each of shape
+            ``(n_tau, n_times)``, preceded by the shape of the grid of priors
+            if the prior parameters are arrays.
+        """
+        taus = np.asarray(taus)
+        if taus.ndim != 1:
+            raise ValueError(
+                'Window sizes storage format must be 1-dimensional')
+        if np.any(taus < 0):
+            raise ValueError('Window sizes must be non-negative.')
+
+        alpha, beta = self._prior_grid(2)
+
+        # cumulative sums indices of the ends and starts of each window
+        ends = np.arange(np.min(taus) + 2, len(self.cases_data) + 1)
+        starts = ends[np.newaxis, :] - taus[:, np.newaxis] - 1
+        invalid = starts < 1
+        starts[invalid] = 0
+
+        cum_cases = self._prefix_sums(self.cases_data)[0]
+        shape = alpha + cum_cases[ends] - cum_cases[starts]
+        rate = beta + sum(
+            coefficient * (cumulative[ends] - cumulative[starts])
+            for coefficient, cumulative in self._rate_terms())
+        shape[..., invalid] = np.nan
+        rate[..., invalid] = np.nan
+
+        return self.cases_times.min() + ends - 1, shape, rate
+
+    def _daily_rates(self):
+        """
+        Returns the expected number of new cases at every time point for a
+        reproduction number of 1: the sum of the infectiousness series of the
+        rate of the posterior, weighted by their coefficients.
+        """
+        return sum(
+            coefficient * np.diff(cumulative)
+            for coefficient, cumulative in self._rate_terms())
+
+    def log_predictive_likelihood(self, taus):
+        r"""
+        Returns the log-likelihood of the incidence number of every time
+        point under the posterior predictive distribution of the window
+        ending at the previous time point, for several sizes of the sliding
+        time window at once.
+
+        With a Gamma-shaped posterior of shape :math:`a` and rate :math:`b`
+        for the window, the incidence number :math:`I` at the next time point,
+        of infectiousness :math:`\Lambda`, follows a negative binomial
+        distribution:
+
+        .. math::
+            \log p(I) = \log \frac{\Gamma(I + a)}{\Gamma(a) I!} +
+            a \log \frac{b}{b + \Lambda} + I \log \frac{\Lambda}{b + \Lambda}
+
+        which is evaluated for all the windows from the posterior parameters
+        of :meth:`run_inference_multi_tau`.
+
+        Parameters
+        ----------
+        taus
+            sequence of sizes of the sliding time window over which the
+            reproduction number is estimated.
+
+        Returns
+        -------
+        tuple
+            The time points of the predicted incidence numbers, of shape
+            ``(n_times,)``, and their log-likelihoods, of shape
+            ``(n_tau, n_times)`` preceded by the shape of the grid of priors
+            if the prior parameters are arrays. Time points without a window
+            of a given size before them are filled with NaN.
+        """
+        times, shape, rate = self.run_inference_multi_tau(taus)
+
+        # the window ending at the last time point predicts no incidence
+        shape, rate = shape[..., :-1], rate[..., :-1]
+        start = len(self.cases_data) - shape.shape[-1]
+        observed = self.cases_data[start:]
+        daily_rates = self._daily_rates()[start:]
+
+        with np.errstate(divide='ignore'):
+            log_likelihood = (
+                scipy.special.gammaln(observed + shape) -
+                scipy.special.gammaln(shape) -
+                scipy.special.gammaln(observed + 1) +
+                shape * np.log(rate) -
+                (shape + observed) * np.log(rate + daily_rates) +
+                scipy.special.xlogy(observed, daily_rates))
+
+        return times[1:], log_likelihood
+
+    def select_tau(self, candidates):
+        """
+        Returns the size of the sliding time window with the best cumulative
+        predictive score among candidates.
+
+        The score of a window size is the sum of the log-likelihoods of the
+        incidence numbers under the posterior predictive distributions of the
+        windows before them, see :meth:`log_predictive_likelihood`, over the
+        time points predicted by all the candidates.
+
+        Parameters
+        ----------
+        candidates
+            sequence of sizes of the sliding time window over which the
+            reproduction number is estimated.
+        """
+        self._check_scalar_prior()
+        candidates = np.asarray(candidates)
+        _, log_likelihood = self.log_predictive_likelihood(candidates)
+
+        common = np.all(~np.isnan(log_likelihood), axis=0)
+        if not np.any(common):
+            raise ValueError(
+                'Incidence data too short to compare the window sizes.')
+
+        scores = np.sum(log_likelihood[:, common], axis=1)
+        return candidates[np.argmax(scores)]
+
+    def _new_time_points(self, time):
+        """
+        Checks the time of appended data and returns the number of time
+        points it adds to the data, including the padding with zeros.
+        """
+        if int(time) != time:
+            raise TypeError('Appended time must be an integer.')
+        num_new = int(time) - np.asarray(self.cases_times)[-1]
+        if num_new <= 0:
+            raise ValueError(
+                'Appended time must be after the last time of the data.')
+        return num_new
+
+    def _extend_data(self, cases_data, num_new, count, name):
+        """
+        Pads with zeros and appends a count to a data array, carrying its
+        cached infectiousness and cumulative sums over to the new array in
+        O(S) per time point.
+
+        The data array and the cached series are grown in buffers kept under
+        the name of the data array, see :func:`_grown`.
+        """
+        new_data = np.zeros(num_new)
+        new_data[-1] = count
+        extended = _grown(self._buffers, name, cases_data, new_data)
+
+        cached = self._infectiousness_cache.pop(id(cases_data), None)
+        if (cached is not None) and (cached[0] is cases_data) and (
+                cached[2] is self._serial_interval):
+            values, infectiousness, cum_cases, cum_infectiousness = (
+                cached[1], *cached[3:])
+            serial_interval = self._serial_interval / self._normalizing_const
+            new_infectiousness = np.empty(num_new)
+            for n, t in enumerate(range(len(cases_data), len(extended))):
+                start_date = max(t - len(serial_interval), 0)
+                new_infectiousness[n] = extended[start_date:t] @ (
+                    serial_interval[-(t - start_date):])
+
+            self._infectiousness_cache[id(extended)] = (
+                extended,
+                _grown(self._buffers, (name, 'values'), values, new_data),
+                self._serial_interval,
+                _grown(
+                    self._buffers, (name, 'infectiousness'), infectiousness,
+                    new_infectiousness),
+                _grown(
+                    self._buffers, (name, 'cum_cases'), cum_cases,
+                    cum_cases[-1] + np.cumsum(new_data)),
+                _grown(
+                    self._buffers, (name, 'cum_infectiousness'),
+                    cum_infectiousness,
+                    cum_infectiousness[-1] + np.cumsum(new_infectiousness)))
+
+        return extended
+
+    def _extended_sums(self, cases_data):
+        """
+        Returns the cumulative sums of a data array and of its infectiousness
+        carried over by :meth:`_extend_data`, without comparing the values of
+        the array with the cached ones, or computes them if they are not
+        cached for the current serial interval.
+        """
+        cached = self._infectiousness_cache.get(id(cases_data))
+        if (cached is not None) and (cached[0] is cases_data) and (
+                cached[2] is self._serial_interval):
+            return cached[4:]
+        return self._prefix_sums(cases_data)
+
+    def _extend_times(self, times, time, name):
+        """
+        Extends the consecutive time points of a data array up to a new
+        time, keeping their storage type; see :func:`_grown`.
+        """
+        values = np.asarray(times)
+        extended = _grown(
+            self._buffers, name, values, np.arange(values[-1] + 1, time + 1))
+        if isinstance(times, pd.Series):
+            return pd.Series(extended, name=times.name, copy=False)
+        return extended
+
+    def _last_window_sums(self, cumulative, tau, num_windows):
+        """
+        Sums a series over the last ``num_windows`` sliding time windows of
+        size tau used in the inference, from its cumulative sums.
+        """
+        end = len(cumulative)
+        return cumulative[(end - num_windows):] - (
+            cumulative[(end - num_windows - tau - 1):(end - tau - 1)])
+
+    def _rate_data(self):
+        """
+        Returns the data arrays whose infectiousness makes up the rate of the
+        posterior, as pairs of a coefficient and a data array.
+        """
+        return [(1, self.cases_data)]
+
+    def _rate_terms(self):
+        """
+        Returns the terms of the rate of the posterior as pairs of a
+        coefficient and the cumulative sums of an infectiousness series, so
+        that the window sums of the rate are the weighted sums of their window
+        sums.
+        """
+        return [
+            (coefficient, self._prefix_sums(data)[1])
+            for coefficient, data in self._rate_data()]
+
+    def _append_inference(self, num_new):
+        """
+        Appends the posterior of the windows ending at the ``num_new`` last
+        time points of the data to the results of the last inference, if
+        any.
+
+        Only the parameters of the new windows are computed, and they are
+        written after the previous ones in buffers, see :func:`_grown`. If
+        the settings of the posterior have changed since the last inference,
+        it is re-run instead.
+        """
+        if not hasattr(self, '_tau'):
+            return
+
+        if self._inference_changed():
+            self.run_inference(self._tau)
+            return
+
+        tau = self._tau
+        num_windows = min(num_new, len(self.cases_data) - tau - 1)
+        if num_windows <= 0:
+            return
+
+        alpha, beta = self._prior_grid(1)
+        shape = alpha + self._last_window_sums(
+            self._extended_sums(self.cases_data)[0], tau, num_windows)
+        rate = beta + sum(
+            coefficient * self._last_window_sums(
+                self._extended_sums(data)[1], tau, num_windows)
+            for coefficient, data in self._rate_data())
+        shape, rate = np.broadcast_arrays(shape, rate)
+
+        last_time = np.asarray(self.cases_times)[-1]
+        self.inference_times += list(range(
+            last_time - num_windows + 1, last_time + 1))
+        self.inference_estimates = _grown(
+            self._buffers, 'inference_estimates', self.inference_estimates,
+            shape / rate)
+        self.inference_posterior = scipy.stats.gamma(
+            _grown(
+                self._buffers, 'shape', self.inference_posterior.args[0],
+                shape),
+            scale=_grown(
+                self._buffers, 'scale',
+                self.inference_posterior.kwds['scale'], 1 / rate))
+
+    def append(self, time, count):
+        """
+        Appends the incidence number of a new time point to the data and, if
+        the inference has been run, the posterior of the new window to its
+        results.
+
+        Only the infectiousness and window sums of the new time point are
+        computed, in O(S + tau) operations for a serial interval of length
+        S, instead of re-running the inference on the whole data; the data
+        and the results are grown in buffers of geometrically increasing
+        sizes, so that they are only copied when the buffers are full. Time
+        points between the last one of the data and the new one are padded
+        with zeros. If the prior or the serial interval have been changed
+        since the inference, it is re-run on the whole data instead, so that
+        all the windows use the same settings.
+
+        Parameters
+        ----------
+        time
+            (int) time of the new incidence number; must be after the last
+            time of the data.
+        count
+            number of new cases at that time.
+        """
+        num_new = self._new_time_points(time)
+
+        self.cases_data = self._extend_data(
+            self.cases_data, num_new, count, 'cases_data')
+        self.cases_times = self._extend_times(
+            self.cases_times, time, 'cases_times')
+
+        self._append_inference(num_new)
+
+    def _interval_summaries(self, probs):
+        """
+        Returns the mean of the posterior and its quantiles at the given
+        probabilities, of shape ``(len(probs),) + mean.shape``, computed from
+        the shape and rate parameters of the Gamma-shaped posterior by the
+        inverse of the regularised incomplete gamma function.
+
+        Parameters
+        ----------
+        probs
+            (1D numpy array) probabilities of the quantiles.
+        """
+        shape = self.inference_posterior.args[0]
+        scale = self.inference_posterior.kwds['scale']
+        mean = np.multiply(shape, scale)
+
+        probs = np.reshape(probs, (-1,) + (1,) * mean.ndim)
+        return mean, scipy.special.gammaincinv(shape, probs) * scale
 
     def get_intervals(self, central_prob):
         """
@@ -227,31 +1202,180 @@ class BranchProPosterior(object):
 
         The lower and upper percentiles are computed from the posterior
         distribution, using the specified central probability to form an
-        equal-tailed interval.
+        equal-tailed interval. Several central probabilities can be given at
+        once; the percentiles of all the new ones are computed together and
+        kept until the inference is run again, so that asking again for a
+        level only builds the dataframe.
 
         The results are returned in a dataframe with the following columns:
-        'Time Points', 'Mean', 'Lower bound CI' and 'Upper bound CI'
+        'Time Points', 'Mean', 'Lower bound CI' and 'Upper bound CI', with
+        the rows of each central probability following each other.
+
+        For a grid of priors, the dataframe holds one row per prior and time
+        point, with the additional columns 'Prior Shape' and 'Prior Rate'.
 
         Parameters
         ----------
         central_prob
             level of the computed credible interval of the estimated
-            R number values. The interval the central probability.
+            R number values. The interval the central probability. A
+            sequence of levels gives the intervals of every level.
         """
-        # compute bounds of credible interval of level central_prob
-        post_dist_interval = self.inference_posterior.interval(central_prob)
+        levels = [float(level) for level in np.atleast_1d(central_prob)]
+
+        # the cached intervals belong to the posterior they were computed for
+        cache = getattr(self, '_intervals_cache', None)
+        if (cache is None) or (cache[0] is not self.inference_posterior):
+            cache = (self.inference_posterior, {})
+            self._intervals_cache = cache
+
+        # compute bounds of credible intervals of the new levels at once
+        new_levels = np.array([
+            level for level in dict.fromkeys(levels) if level not in cache[1]])
+        if len(new_levels) > 0:
+            mean, bounds = self._interval_summaries(
+                np.concatenate(((1 - new_levels) / 2, (1 + new_levels) / 2)))
+            for lower, upper, level in zip(
+                    bounds, bounds[len(new_levels):], new_levels):
+                cache[1][level] = (mean, lower, upper)
+
+        intervals_df = pd.concat(
+            [self._intervals_frame(level, *cache[1][level])
+             for level in levels],
+            ignore_index=True)
+
+        self.inference_estimates = cache[1][levels[0]][0]
+        return intervals_df
 
-        intervals_df = pd.DataFrame(
+    def get_predictive_intervals(self, central_prob):
+        """
+        Returns a dataframe of the mean and percentiles of the posterior
+        predictive distribution of the incidence number at the time point
+        following each window of the last inference, and the probability of
+        the incidence number observed at that time point.
+
+        As the reproduction number of each window follows a Gamma-shaped
+        posterior, the incidence number follows a negative binomial
+        distribution, or a mixture of them for posteriors which are mixtures
+        of Gamma distributions, whose percentiles and probabilities are
+        computed in closed form for all the time points at once. The last
+        window predicts the time point following the data, for which the
+        observed incidence and its probability are NaN.
+
+        The results are returned in a dataframe with the following columns:
+        'Time Points', 'Mean', 'Lower bound CI', 'Upper bound CI',
+        'Central Probability', 'Observed' and 'Observed Probability'.
+
+        Parameters
+        ----------
+        central_prob
+            level of the computed prediction interval of the incidence
+            numbers. The interval the central probability.
+        """
+        self._check_scalar_prior()
+        shape, rates, daily_rates, weights = self._predictive_components()
+        num_times = rates.shape[1]
+
+        observed = np.append(
+            self.cases_data[(len(self.cases_data) - num_times + 1):], np.nan)
+        success = rates / (rates + daily_rates)
+        lower, upper = _nbinom_mixture_quantiles(
+            shape, success, weights,
+            np.array([1 - central_prob, 1 + central_prob]) / 2)
+
+        return pd.DataFrame(
             {
-                'Time Points': self.inference_times,
-                'Mean': self.inference_estimates,
-                'Lower bound CI': post_dist_interval[0],
-                'Upper bound CI': post_dist_interval[1],
-                'Central Probability': central_prob
+                'Time Points': np.array(self.inference_times) + 1,
+                'Mean': np.sum(weights * shape * daily_rates / rates, axis=0),
+                'Lower bound CI': lower,
+                'Upper bound CI': upper,
+                'Central Probability': central_prob,
+                'Observed': observed,
+                'Observed Probability': np.sum(
+                    weights * scipy.stats.nbinom.pmf(
+                        observed, shape, success), axis=0)
             }
         )
 
-        return intervals_df
+    def _kernel_infectiousness(self, cases_data):
+        """
+        Returns the expected number of new cases at every time point of a data
+        array and at the time point following it, for each serial interval of
+        the posterior, of shape ``(n_serial_intervals, n_times + 1)``.
+        """
+        serial_interval = self._serial_interval / self._normalizing_const
+        return np.append(
+            self._infectiousness(cases_data), _last_infectiousness(
+                serial_interval[np.newaxis], cases_data))[np.newaxis]
+
+    def _predictive_components(self):
+        """
+        Returns the components of the posterior predictive distributions of
+        the incidence numbers at the time points following the windows of the
+        last inference, as the shape parameters of the posterior, and the
+        rate parameters, expected incidences for R = 1 and weights of each
+        component, each of shape ``(n_components, n_times)``.
+        """
+        shape = self.inference_posterior.args[0]
+        rates = (1 / self.inference_posterior.kwds['scale'])[np.newaxis]
+        daily_rates = sum(
+            coefficient * self._kernel_infectiousness(data)
+            for coefficient, data in self._rate_data())
+        return shape, rates, daily_rates[:, -rates.shape[1]:], np.ones(
+            rates.shape)
+
+    def _intervals_frame(self, central_prob, mean, lower, upper):
+        """
+        Returns the dataframe of the posterior mean and credible interval of
+        a single central probability; see :meth:`get_intervals`.
+        """
+        intervals = {
+            'Time Points': self.inference_times,
+            'Mean': mean,
+            'Lower bound CI': lower,
+            'Upper bound CI': upper,
+            'Central Probability': central_prob
+        }
+
+        if np.ndim(mean) > 1:
+            # one row per prior of the grid and time point
+            alpha, beta = self._prior_grid(1)
+            intervals = {
+                key: np.broadcast_to(value, mean.shape).ravel()
+                for key, value in dict(
+                    {'Prior Shape': alpha, 'Prior Rate': beta},
+                    **intervals).items()}
+
+        return pd.DataFrame(intervals)
+
+    def get_inference_result(self):
+        """
+        Returns the results of the last inference as an
+        :class:`InferenceResult`, which holds the parameters of the
+        posterior in contiguous arrays and computes its summaries on demand.
+
+        The prior, tau and serial interval of the result are the ones the
+        inference was run with, even if the posterior was changed since; the
+        normalised serial interval is identified in the result by the SHA-256
+        hash of its values.
+
+        """
+        if not hasattr(self, '_tau'):
+            raise ValueError(
+                'No inference with a Gamma-shaped posterior has been run.')
+        settings = self._inference_parameters
+        prior_parameters = (settings['alpha'], settings['beta'])
+        self._check_scalar_prior(prior_parameters)
+
+        serial_interval = settings['serial_interval'][::-1]
+        return InferenceResult(
+            self.cases_times.min() + 1 + self._tau,
+            self.inference_posterior.args[0],
+            1 / self.inference_posterior.kwds['scale'],
+            prior_parameters, self._tau,
+            serial_interval_hash=hashlib.sha256(np.ascontiguousarray(
+                serial_interval / np.sum(serial_interval),
+                dtype=float).tobytes()).hexdigest())
 
 
 #
@@ -271,7 +1395,9 @@ class BranchProPosteriorMultSI(BranchProPosterior):
         (pandas Dataframe) contains numbers of new cases by time unit (usually
         days).
         Data stored in columns of with one for time and one for incidence
-        number, respectively.
+        number, respectively. Alternatively, (1D numpy array) numbers of new
+        cases at consecutive time units including zeros, starting at
+        ``time_start``.
     daily_serial_intervals
         (list of lists) List of unnormalised probability distributions of that
         the recipient first displays symptoms s days after the infector first
@@ -284,21 +1410,39 @@ class BranchProPosteriorMultSI(BranchProPosterior):
         label key given to the temporal data in the inc_data dataframe.
     inc_key
         label key given to the incidental data in the inc_data dataframe.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of each serial interval
+        removed from their common tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`.
+    n_workers
+        (int) Optional number of processes the serial intervals (in
+        :meth:`run_inference`) and the time points (in :meth:`get_intervals`)
+        are distributed across; if None, all the computations are run in the
+        current process.
+    time_start
+        (int) time of the first incidence number when inc_data is a numpy
+        array; defaults to 0.
     """
+    # Maximum number of posterior draws held in memory at once when the
+    # inference is run with samples
+    max_chunk_draws = 2 ** 22
+
     def __init__(
             self, inc_data, daily_serial_intervals, alpha, beta,
-            time_key='Time', inc_key='Incidence Number'):
+            time_key='Time', inc_key='Incidence Number', si_tolerance=None,
+            n_workers=None, time_start=None):
 
         super().__init__(
             inc_data, daily_serial_intervals[0], alpha, beta, time_key,
-            inc_key)
+            inc_key, si_tolerance, time_start)
 
         for si in daily_serial_intervals:
             self._check_serial(si)
 
         self._serial_intervals = np.flip(
-            np.asarray(daily_serial_intervals), axis=1)
+            self._compact(daily_serial_intervals), axis=1)
         self._normalizing_consts = np.sum(self._serial_intervals, axis=1)
+        self.n_workers = n_workers
 
     def get_serial_intervals(self):
         """
@@ -326,10 +1470,12 @@ class BranchProPosteriorMultSI(BranchProPosterior):
                     'Chosen times storage format must be 2-dimensional')
 
         # Invert order of serial intervals for ease in _effective_no_infectives
-        self._serial_intervals = np.flip(np.asarray(serial_intervals), axis=1)
+        self._serial_intervals = np.flip(
+            self._compact(serial_intervals), axis=1)
         self._normalizing_consts = np.sum(self._serial_intervals, axis=1)
+        self._infectiousness_cache.clear()
 
-    def run_inference(self, tau, num_samples=1000):
+    def run_inference(self, tau, num_samples=None):
         """
         Runs the inference of the reproduction numbers based on the entirety
         of the incidence data available.
@@ -337,63 +1483,250 @@ class BranchProPosteriorMultSI(BranchProPosterior):
         First inferred R value is given at the immediate time point after which
         the tau-window of the initial incidences ends.
 
+        The posterior is the equal-weight mixture of the Gamma-shaped
+        posteriors of the serial intervals stored. By default, its mean and
+        percentiles are computed exactly by :meth:`get_intervals`; if
+        ``num_samples`` is given, they are instead estimated from draws of
+        the posterior. The draws are generated and reduced in chunks of time
+        points of at most ``max_chunk_draws`` values, from a seed fixed here
+        so that every call of :meth:`get_intervals` uses the same draws.
+
         Parameters
         ----------
         tau
             size sliding time window over which the reproduction number is
             estimated.
         num_samples
-            (int) number of draws from the posterior computed for each serial
-            interval stored.
+            (int) Optional number of draws from the posterior computed for
+            each serial interval stored.
+
+        Notes
+        -----
+        The posterior for the last serial interval stored is kept in
+        ``inference_posterior``, and ``inference_estimates`` holds the mean
+        of the posterior over all serial intervals.
         """
-        samples = []
+        self._check_scalar_prior()
+        alpha, beta = self.prior_parameters
 
-        for nc, si in zip(self._normalizing_consts, self._serial_intervals):
-            self._serial_interval = si
-            self._normalizing_const = nc
-            super().run_inference(tau)
-            samples.append(np.asarray(self.inference_posterior.rvs(
-                size=(num_samples, len(
-                    self.inference_posterior.args[0]))), dtype=np.float32))
+        # compute shape parameter of the posterior over time, common to all
+        # serial intervals
+        shape = alpha + self._window_sums(
+            self._prefix_sums(self.cases_data)[0], tau)
+
+        # compute rate parameters of the posterior over time for all serial
+        # intervals at once
+        if self.n_workers is None:
+            rates = beta + sum(
+                coefficient * self._window_sums(
+                    self._multi_prefix_sums(data), tau)
+                for coefficient, data in self._rate_data())
+        else:
+            rates = beta + self._parallel_rates(tau)
 
-        self._inference_samples = np.vstack(samples)
+        self.inference_times = list(range(
+            self.cases_times.min()+1+tau, self.cases_times.max()+1))
+        self.inference_estimates = np.mean(shape / rates, axis=0)
+        self.inference_posterior = scipy.stats.gamma(
+            shape, scale=1/rates[-1])
+        self._posterior_shape = shape
+        self._posterior_rates = rates
+        self._num_samples = num_samples
+        self._sample_seed = np.random.randint(2 ** 32, dtype=np.uint64)
+        self._tau = tau
+
+    def run_inference_multi_tau(self, taus):
+        """
+        Raises a ValueError, as the inference for several sizes of the sliding
+        time window, and the predictive scores and choice of window built on
+        it (:meth:`log_predictive_likelihood` and :meth:`select_tau`), only
+        use a single serial interval.
 
-    def get_intervals(self, central_prob):
         """
-        Returns a dataframe of the reproduction number posterior mean
-        with percentiles over time.
+        raise ValueError(
+            'Inference for several window sizes is not supported with '
+            'multiple serial intervals.')
 
-        The lower and upper percentiles are computed from the posterior
-        distribution, using the specified central probability to form an
-        equal-tailed interval.
+    def _sampled_summaries(self, probs):
+        """
+        Returns the mean and percentiles of the posterior estimated from
+        ``num_samples`` draws for each serial interval, generated and reduced
+        in chunks of time points so that at most ``max_chunk_draws`` draws
+        are held in memory at once.
 
-        The results are returned in a dataframe with the following columns:
-        'Time Points', 'Mean', 'Lower bound CI' and 'Upper bound CI'
+        Parameters
+        ----------
+        probs
+            (1D numpy array) probabilities of the percentiles.
+        """
+        return _sampled_mixture_summaries(
+            self._posterior_shape, self._posterior_rates, probs,
+            self._num_samples, np.random.default_rng(self._sample_seed),
+            self.max_chunk_draws)
+
+    def _parallel_rates(self, tau):
+        """
+        Returns the window sums of the rates of the posterior for all serial
+        intervals, with the serial intervals split in blocks across
+        ``n_workers`` processes which read the serial intervals and the data
+        from shared memory.
+        """
+        coefficients, rate_data = zip(*self._rate_data())
+        blocks = [
+            _share(self._serial_intervals / self._normalizing_consts[
+                :, np.newaxis]),
+            _share(np.stack(rate_data))]
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                rates = list(executor.map(
+                    _rates_worker,
+                    *zip(*[
+                        (blocks[0][1], blocks[1][1], coefficients, tau, rows)
+                        for rows in np.array_split(
+                            np.arange(len(self._serial_intervals)),
+                            self.n_workers)])))
+        finally:
+            for block, _ in blocks:
+                block.close()
+                block.unlink()
+
+        return np.concatenate(rates)
+
+    def _parallel_summaries(self, probs):
+        """
+        Returns the mean and percentiles of the posterior, with the time
+        points split in blocks across ``n_workers`` processes which read the
+        rates of the posterior from shared memory.
+        """
+        time_blocks = np.array_split(
+            np.arange(len(self._posterior_shape)), self.n_workers)
+        seeds = np.random.SeedSequence(self._sample_seed).spawn(
+            len(time_blocks))
+
+        block, shared_rates = _share(self._posterior_rates)
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                summaries = list(executor.map(
+                    _summaries_worker,
+                    *zip(*[
+                        (self._posterior_shape, shared_rates, probs,
+                         self._num_samples, seed, self.max_chunk_draws, times)
+                        for seed, times in zip(seeds, time_blocks)])))
+        finally:
+            block.close()
+            block.unlink()
+
+        mean, percentiles = zip(*summaries)
+        return np.concatenate(mean), np.concatenate(percentiles, axis=1)
+
+    def _multi_prefix_sums(self, cases_data):
+        """
+        Returns the cumulative sums, starting at 0, of the infectiousness of a
+        data array for every serial interval stored, of shape
+        ``(n_serial_intervals, n_times + 1)``.
+
+        The infectiousness of all serial intervals is computed as a single
+        product of the matrix of the normalised serial intervals with the
+        matrix of the incidences preceding each time point, without changing
+        the serial interval used by :meth:`_prefix_sums`. The result is
+        cached until :meth:`set_serial_intervals` is called.
 
         Parameters
         ----------
-        central_prob
-            level of the computed credible interval of the estimated
-            R number values. The interval the central probability.
+        cases_data
+            (1D numpy array) contains numbers of cases occuring in each time
+            unit (usually days) including zeros.
         """
-        # compute mean and bounds of credible interval of level central_prob
-        self.inference_estimates = np.mean(self._inference_samples, axis=0)
-        lb = 100*(1-central_prob)/2
-        ub = 100*(1+central_prob)/2
-        post_dist_interval = np.percentile(
-            self._inference_samples, q=np.array([lb, ub]), axis=0)
+        key = ('multi', id(cases_data))
+        cached = self._cached(key, cases_data, self._serial_intervals)
+        if cached is not None:
+            return cached[0]
 
-        intervals_df = pd.DataFrame(
-            {
-                'Time Points': self.inference_times,
-                'Mean': self.inference_estimates,
-                'Lower bound CI': post_dist_interval[0],
-                'Upper bound CI': post_dist_interval[1],
-                'Central Probability': central_prob
-            }
-        )
+        cumulative = _multi_infectiousness_sums(
+            self._serial_intervals / self._normalizing_consts[:, np.newaxis],
+            cases_data)
 
-        return intervals_df
+        self._infectiousness_cache[key] = (
+            cases_data, cases_data.copy(), self._serial_intervals, cumulative)
+        return cumulative
+
+    def _extend_data(self, cases_data, num_new, count, name):
+        """
+        Pads with zeros and appends a count to a data array, see
+        :meth:`BranchProPosterior._extend_data`, evicting the cumulative sums
+        of the serial intervals cached for the old array.
+        """
+        self._infectiousness_cache.pop(('multi', id(cases_data)), None)
+        return super()._extend_data(cases_data, num_new, count, name)
+
+    def _append_inference(self, num_new):
+        """
+        Re-runs the last inference, if any, on the extended data, as the
+        posterior samples of the serial intervals cannot be extended.
+        """
+        if hasattr(self, '_tau'):
+            self.run_inference(self._tau, self._num_samples)
+
+    def _kernel_infectiousness(self, cases_data):
+        """
+        Returns the expected number of new cases at every time point of a data
+        array and at the time point following it, for each serial interval
+        stored, of shape ``(n_serial_intervals, n_times + 1)``.
+        """
+        serial_intervals = self._serial_intervals / (
+            self._normalizing_consts[:, np.newaxis])
+        return np.hstack((
+            np.diff(self._multi_prefix_sums(cases_data), axis=1),
+            _last_infectiousness(serial_intervals, cases_data)[:, np.newaxis]))
+
+    def _predictive_components(self):
+        """
+        Returns the components of the posterior predictive distributions of
+        the incidence numbers, one per serial interval stored with equal
+        weights; see :meth:`BranchProPosterior._predictive_components`.
+        """
+        rates = self._posterior_rates
+        daily_rates = sum(
+            coefficient * self._kernel_infectiousness(data)
+            for coefficient, data in self._rate_data())
+        return self._posterior_shape, rates, daily_rates[
+            :, -rates.shape[1]:], np.full(rates.shape, 1 / len(rates))
+
+    def get_inference_result(self):
+        """
+        Raises a ValueError, as the posterior is a mixture over the serial
+        intervals rather than a Gamma distribution.
+
+        """
+        raise ValueError(
+            'The posterior with multiple serial intervals is not '
+            'Gamma-shaped.')
+
+    def _interval_summaries(self, probs):
+        """
+        Returns the mean of the posterior and its quantiles at the given
+        probabilities, of shape ``(len(probs), n_times)``.
+
+        They are the exact mean and quantiles of the mixture of the
+        posteriors of the serial intervals, unless the inference was run with
+        ``num_samples``, in which case they are estimated from the posterior
+        samples, see :meth:`run_inference`.
+
+        Parameters
+        ----------
+        probs
+            (1D numpy array) probabilities of the quantiles.
+        """
+        if self.n_workers is not None:
+            return self._parallel_summaries(probs)
+
+        if self._num_samples is None:
+            return (
+                np.mean(self._posterior_shape / self._posterior_rates, axis=0),
+                _gamma_mixture_quantiles(
+                    self._posterior_shape, self._posterior_rates, probs))
+
+        return self._sampled_summaries(probs)
 
 #
 # LocImpBranchProPosterior Class
@@ -428,12 +1761,15 @@ class LocImpBranchProPosterior(BranchProPosterior):
         (pandas Dataframe) contains numbers of local new cases by time unit
         (usually days).
         Data stored in columns of with one for time and one for incidence
-        number, respectively.
+        number, respectively. Alternatively, (1D numpy array) numbers of local
+        new cases at consecutive time units including zeros, starting at
+        ``time_start``, which is used without padding or copying.
     imported_inc_data
         (pandas Dataframe) contains numbers of imported new cases by time unit
         (usually days).
         Data stored in columns of with one for time and one for incidence
-        number, respectively.
+        number, respectively. Alternatively, (1D numpy array) numbers of
+        imported new cases at the time units of the local ones.
     epsilon
         (numeric) Proportionality constant of the R number for imported cases
         with respect to its analog for local ones.
@@ -451,6 +1787,14 @@ class LocImpBranchProPosterior(BranchProPosterior):
     inc_key
         label key given to the incidental data in the inc_data and
         imported_inc_data dataframes.
+    si_tolerance
+        (float) Optional maximum fraction of the mass of the serial interval
+        removed from its tail to shorten the renewal sums; see
+        :func:`compact_serial_interval`. The removed fraction is stored in
+        ``si_truncation_error``.
+    time_start
+        (int) time of the first incidence number when inc_data is a numpy
+        array; defaults to 0.
 
     Notes
     -----
@@ -460,34 +1804,51 @@ class LocImpBranchProPosterior(BranchProPosterior):
     def __init__(
             self, inc_data, imported_inc_data, epsilon,
             daily_serial_interval, alpha, beta,
-            time_key='Time', inc_key='Incidence Number'):
+            time_key='Time', inc_key='Incidence Number', si_tolerance=None,
+            time_start=None):
 
         super().__init__(
-            inc_data, daily_serial_interval, alpha, beta, time_key, inc_key)
+            inc_data, daily_serial_interval, alpha, beta, time_key, inc_key,
+            si_tolerance, time_start)
 
-        if not issubclass(type(imported_inc_data), pd.DataFrame):
-            raise TypeError('Imported incidence data has to be a dataframe')
+        if isinstance(imported_inc_data, np.ndarray):
+            if imported_inc_data.shape != self.cases_data.shape:
+                raise ValueError(
+                    'Imported incidence data must match the shape of the '
+                    'local incidence data')
 
-        if time_key not in imported_inc_data.columns:
-            raise ValueError('No time column with this name in given data')
+            self.imp_cases_labels = [time_key, inc_key]
+            self.imp_cases_data = imported_inc_data
+            self.imp_cases_times = self.cases_times
 
-        if inc_key not in imported_inc_data.columns:
-            raise ValueError(
-                'No imported incidence column with this name in given data')
+        else:
+            if not issubclass(type(imported_inc_data), pd.DataFrame):
+                raise TypeError(
+                    'Imported incidence data has to be a dataframe or a '
+                    'numpy array')
 
-        data_times = inc_data[time_key]
+            if time_key not in imported_inc_data.columns:
+                raise ValueError(
+                    'No time column with this name in given data')
 
-        # Pad with zeros the time points where we have no information on
-        # the number of imported incidences
-        padded_imp_inc_data = imported_inc_data.set_index(time_key).reindex(
-            range(
-                min(data_times), max(data_times)+1)
-                ).fillna(0).reset_index()
+            if inc_key not in imported_inc_data.columns:
+                raise ValueError(
+                    'No imported incidence column with this name in given '
+                    'data')
+
+            # Pad with zeros the time points where we have no information on
+            # the number of imported incidences
+            padded_imp_inc_data = imported_inc_data.set_index(
+                time_key).reindex(
+                    range(
+                        self.cases_times.min(), self.cases_times.max()+1)
+                    ).fillna(0).reset_index()
+
+            self.imp_cases_labels = list(
+                padded_imp_inc_data[[time_key, inc_key]].columns)
+            self.imp_cases_data = padded_imp_inc_data[inc_key].to_numpy()
+            self.imp_cases_times = padded_imp_inc_data[time_key]
 
-        self.imp_cases_labels = list(
-            padded_imp_inc_data[[time_key, inc_key]].columns)
-        self.imp_cases_data = padded_imp_inc_data[inc_key].to_numpy()
-        self.imp_cases_times = padded_imp_inc_data[time_key]
         self.set_epsilon(epsilon)
 
     def set_epsilon(self, new_epsilon):
@@ -508,55 +1869,271 @@ class LocImpBranchProPosterior(BranchProPosterior):
 
         self.epsilon = new_epsilon
 
-    def run_inference(self, tau):
+    def _inference_settings(self):
         """
-        Runs the inference of the reproduction numbers based on the entirety
-        of the local and imported incidence data available.
+        Returns the current settings of the posterior the results of an
+        inference depend on, besides the data and tau: the parameters of the
+        prior, the serial interval and epsilon.
+        """
+        return dict(super()._inference_settings(), epsilon=self.epsilon)
+
+    def run_inference_epsilon_sweep(self, tau, epsilons):
+        """
+        Runs the inference of the reproduction numbers for several values of
+        epsilon at once.
 
-        First inferred (local) R value is given at the immediate time point
-        after which the tau-window of the initial incidences ends.
+        The window sums of the local and imported infectiousness are
+        computed once, from the cached cumulative sums, and kept separate, so
+        that the rate of the posterior for every epsilon is a single vector
+        operation. The value of ``epsilon`` stored is left unchanged.
 
         Parameters
         ----------
         tau
             size sliding time window over which the reproduction number is
             estimated.
+        epsilons
+            sequence of proportionality constants of the R number for
+            imported cases with respect to its analog for local ones.
+
+        Returns
+        -------
+        tuple
+            The time points, of shape ``(n_times,)``, and the shape and rate
+            parameters of the Gamma-shaped posterior, each of shape
+            ``(n_epsilon, n_times)``, preceded by the shape of the grid of
+            priors if the prior parameters are arrays.
         """
-        total_time = self.cases_times.max() - self.cases_times.min() + 1
-        alpha, beta = self.prior_parameters
-        time_init_inf_r = tau + 1
+        epsilons = np.asarray(epsilons, dtype=float)
+        if epsilons.ndim != 1:
+            raise ValueError(
+                'Epsilon values storage format must be 1-dimensional')
+        if np.any(epsilons < -1):
+            raise ValueError('Epsilon needs to be greater or equal to -1.')
+
+        alpha, beta = self._prior_grid(2)
+        local, imported = (
+            self._window_sums(self._prefix_sums(data)[1], tau)
+            for data in (self.cases_data, self.imp_cases_data))
+
+        shape = alpha + self._window_sums(
+            self._prefix_sums(self.cases_data)[0], tau)
+        rate = beta + local + (1 + epsilons[:, np.newaxis]) * imported
+        shape, rate = np.broadcast_arrays(shape, rate)
+
+        times = self.cases_times.min() + 1 + tau + np.arange(rate.shape[-1])
+        return times, shape.copy(), rate
+
+    def run_inference_epsilon_marginal(
+            self, tau, epsilons, epsilon_prior=None):
+        r"""
+        Runs the inference of the reproduction numbers with a discrete prior
+        over a grid of values of epsilon, instead of a fixed one.
+
+        In every window, the posterior probability of each epsilon is
+        proportional to its prior probability times the Gamma-Poisson
+        marginal likelihood of the incidences of the window, in which only
+
+        .. math::
+            \sum_{s} I_{s} \log \Lambda_{s}(\epsilon) -
+            (\alpha + \sum_{s} I_{s})
+            \log \left(\beta + \sum_{s} \Lambda_{s}(\epsilon)\right)
+
+        depends on epsilon, with :math:`\Lambda_{s}(\epsilon)` the local
+        plus ``1 + epsilon`` times the imported infectiousness. It is
+        evaluated for the whole grid at once from window sums. The posterior
+        of the reproduction number is the mixture of the Gamma-shaped
+        posteriors of the grid with these probabilities as weights, whose
+        mean and exact percentiles are computed by :meth:`get_intervals`.
+        Windows in which the incidences are impossible for every epsilon get
+        NaN values.
+
+        The posterior probabilities of epsilon are stored in
+        ``epsilon_posterior``, of shape ``(n_epsilon, n_times)``; see
+        :meth:`get_epsilon_posterior`. The value of ``epsilon`` stored is
+        left unchanged.
+
+        Parameters
+        ----------
+        tau
+            size sliding time window over which the reproduction number is
+            estimated.
+        epsilons
+            sequence of proportionality constants of the R number for
+            imported cases with respect to its analog for local ones.
+        epsilon_prior
+            Optional sequence of the prior probabilities, up to a constant,
+            of the values of epsilon; if None, the prior is uniform over the
+            grid.
+        """
+        self._check_scalar_prior()
+        epsilons = np.asarray(epsilons, dtype=float)
+        if epsilon_prior is None:
+            epsilon_prior = np.ones(epsilons.shape)
+        epsilon_prior = np.asarray(epsilon_prior, dtype=float)
+        if (epsilon_prior.shape != epsilons.shape) or np.any(
+                epsilon_prior < 0) or not np.any(epsilon_prior > 0):
+            raise ValueError(
+                'Epsilon prior must hold one non-negative weight per value '
+                'of epsilon.')
+
+        times, shape, rate = self.run_inference_epsilon_sweep(tau, epsilons)
+
+        # sum over each window of the incidences times the log of the
+        # infectiousness, for all the values of epsilon at once; incidences
+        # with no infectiousness are counted apart so that they do not turn
+        # the cumulative sums infinite
+        local, imported = (
+            self._infectiousness(data)
+            for data in (self.cases_data, self.imp_cases_data))
+        infectiousness = local + (1 + epsilons[:, np.newaxis]) * imported
+        impossible = (self.cases_data > 0) & (infectiousness <= 0)
+        log_terms = scipy.special.xlogy(
+            self.cases_data, np.where(impossible, 1, infectiousness))
+        log_terms, impossible = (
+            self._window_sums(np.cumsum(
+                np.pad(terms, ((0, 0), (1, 0))), axis=1), tau)
+            for terms in (log_terms, impossible))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_weights = np.where(
+                impossible > 0, -np.inf,
+                np.log(epsilon_prior)[:, np.newaxis] + log_terms - (
+                    shape * np.log(rate)))
+            weights = np.exp(log_weights - scipy.special.logsumexp(
+                log_weights, axis=0))
+
+        self.inference_times = list(times)
+        self.inference_estimates = np.sum(weights * shape / rate, axis=0)
+        self.inference_posterior = scipy.stats.gamma(shape, scale=1/rate)
+        self.epsilon_values = epsilons
+        self.epsilon_posterior = weights
+        self._epsilon_weights = (self.inference_posterior, weights)
+
+        # the mixture posterior is not extended by append
+        if hasattr(self, '_tau'):
+            del self._tau
+
+    def get_epsilon_posterior(self):
+        """
+        Returns a dataframe of the posterior probabilities of the values of
+        epsilon in every window of the last inference run by
+        :meth:`run_inference_epsilon_marginal`.
 
-        shape = []
-        rate = []
-        mean = []
+        The results are returned in a dataframe with one row per time point
+        and value of epsilon, and the following columns: 'Time Points',
+        'Epsilon' and 'Probability'.
+        """
+        num_epsilons, num_times = self.epsilon_posterior.shape
 
-        for time in range(time_init_inf_r+1, total_time+1):
-            # get cases in tau window
-            start_window = time - tau
-            end_window = time + 1
+        return pd.DataFrame(
+            {
+                'Time Points': np.tile(self.inference_times, num_epsilons),
+                'Epsilon': np.repeat(self.epsilon_values, num_times),
+                'Probability': self.epsilon_posterior.ravel()
+            }
+        )
 
-            # compute shape parameter of the posterior over time
-            shape.append(
-                alpha + np.sum(
-                    self.cases_data[(start_window-1):(end_window-1)]))
+    def _rate_data(self):
+        """
+        Returns the data arrays whose infectiousness makes up the rate of the
+        posterior: the local incidences, and the imported incidences weighted
+        by ``1 + epsilon``.
+        """
+        return [(1, self.cases_data), (1 + self.epsilon, self.imp_cases_data)]
 
-            # compute rate parameter of the posterior over time
+    def append(self, time, count, imported=0):
+        """
+        Appends the local and imported incidence numbers of a new time point
+        to the data and, if the inference has been run, the posterior of the
+        new window to its results.
+
+        Only the infectiousness and window sums of the new time point are
+        computed, in O(S + tau) operations for a serial interval of length
+        S, instead of re-running the inference on the whole data; the data
+        and the results are grown in buffers of geometrically increasing
+        sizes, so that they are only copied when the buffers are full. Time
+        points between the last one of the data and the new one are padded
+        with zeros. If the prior, the serial interval or epsilon have been
+        changed since the inference, it is re-run on the whole data instead,
+        so that all the windows use the same settings.
 
-            rate.append(beta + self._infectives_in_tau(
-                self.cases_data, start_window, end_window) +
-                (1 + self.epsilon) * self._infectives_in_tau(
-                self.imp_cases_data, start_window, end_window))
+        Parameters
+        ----------
+        time
+            (int) time of the new incidence numbers; must be after the last
+            time of the data.
+        count
+            number of new local cases at that time.
+        imported
+            number of new imported cases at that time.
+        """
+        num_new = self._new_time_points(time)
 
-        # compute the mean of the Gamma-shaped posterior over time
-        mean = np.divide(shape, rate)
+        self.imp_cases_data = self._extend_data(
+            self.imp_cases_data, num_new, imported, 'imp_cases_data')
+        self.imp_cases_times = self._extend_times(
+            self.imp_cases_times, time, 'imp_cases_times')
 
-        # compute the Gamma-shaped posterior distribution
-        post_dist = scipy.stats.gamma(shape, scale=1/np.array(rate))
+        super().append(time, count)
 
-        self.inference_times = list(range(
-            self.cases_times.min()+1+tau, self.cases_times.max()+1))
-        self.inference_estimates = mean
-        self.inference_posterior = post_dist
+    def _predictive_components(self):
+        """
+        Returns the components of the posterior predictive distributions of
+        the incidence numbers; see
+        :meth:`BranchProPosterior._predictive_components`. If the last
+        inference was run by :meth:`run_inference_epsilon_marginal`, there is
+        one component per value of epsilon, weighted by its posterior
+        probability.
+        """
+        cached = getattr(self, '_epsilon_weights', None)
+        if (cached is None) or (cached[0] is not self.inference_posterior):
+            return super()._predictive_components()
+
+        shape = self.inference_posterior.args[0]
+        rates = 1 / self.inference_posterior.kwds['scale']
+        local, imported = (
+            self._kernel_infectiousness(data)[:, -rates.shape[1]:]
+            for data in (self.cases_data, self.imp_cases_data))
+        daily_rates = local + (
+            1 + self.epsilon_values[:, np.newaxis]) * imported
+        return shape[0], rates, daily_rates, cached[1]
+
+    def get_inference_result(self):
+        """
+        Returns the results of the last inference as an
+        :class:`InferenceResult`, with the value of ``epsilon`` it was run
+        with.
+
+        """
+        result = super().get_inference_result()
+        result.epsilon = self._inference_parameters['epsilon']
+        return result
+
+    def _interval_summaries(self, probs):
+        """
+        Returns the mean of the posterior and its quantiles at the given
+        probabilities, of shape ``(len(probs), n_times)``.
+
+        If the last inference was run by
+        :meth:`run_inference_epsilon_marginal`, they are the exact mean and
+        quantiles of the mixture of the posteriors of the values of epsilon.
+
+        Parameters
+        ----------
+        probs
+            (1D numpy array) probabilities of the quantiles.
+        """
+        cached = getattr(self, '_epsilon_weights', None)
+        if (cached is None) or (cached[0] is not self.inference_posterior):
+            return super()._interval_summaries(probs)
+
+        shape = self.inference_posterior.args[0]
+        rates = 1 / self.inference_posterior.kwds['scale']
+        weights = cached[1]
+        mean = np.sum(weights * shape / rates, axis=0)
+        quantiles = _gamma_mixture_quantiles(shape[0], rates, probs, weights)
+        return mean, np.where(np.isnan(mean), np.nan, quantiles)
 
 
 #
@@ -571,44 +2148,30 @@ class LocImpBranchProPosteriorMultSI(
     def __init__(
             self, inc_data, imported_inc_data, epsilon,
             daily_serial_intervals, alpha, beta,
-            time_key='Time', inc_key='Incidence Number'):
+            time_key='Time', inc_key='Incidence Number', si_tolerance=None,
+            n_workers=None, time_start=None):
 
         LocImpBranchProPosterior.__init__(
             self, inc_data, imported_inc_data, epsilon,
-            daily_serial_intervals[0], alpha, beta, time_key, inc_key)
+            daily_serial_intervals[0], alpha, beta, time_key, inc_key,
+            si_tolerance, time_start)
 
         for si in daily_serial_intervals:
             self._check_serial(si)
 
         self._serial_intervals = np.flip(
-            np.asarray(daily_serial_intervals), axis=1)
+            self._compact(daily_serial_intervals), axis=1)
         self._normalizing_consts = np.sum(self._serial_intervals, axis=1)
+        self.n_workers = n_workers
 
-    def run_inference(self, tau, num_samples=1000):
+    def run_inference_epsilon_sweep(self, tau, epsilons):
         """
-        Runs the inference of the reproduction numbers based on the entirety
-        of the incidence data available.
+        Raises a ValueError, as the inference for several values of epsilon,
+        and the inference marginalised over epsilon built on it
+        (:meth:`run_inference_epsilon_marginal`), only use a single serial
+        interval.
 
-        First inferred R value is given at the immediate time point after which
-        the tau-window of the initial incidences ends.
-
-        Parameters
-        ----------
-        tau
-            size sliding time window over which the reproduction number is
-            estimated.
-        num_samples
-            (int) number of draws from the posterior computed for each serial
-            interval stored.
         """
-        samples = []
-
-        for nc, si in zip(self._normalizing_consts, self._serial_intervals):
-            self._serial_interval = si
-            self._normalizing_const = nc
-            LocImpBranchProPosterior.run_inference(self, tau)
-            samples.append(np.asarray(self.inference_posterior.rvs(
-                size=(num_samples, len(
-                    self.inference_posterior.args[0]))), dtype=np.float32))
-
-        self._inference_samples = np.vstack(samples)
+        raise ValueError(
+            'Inference for several values of epsilon is not supported with '
+            'multiple serial intervals.')
@@ -0,0 +1,63 @@
+#
+# Serial interval utilities
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import numpy as np
+
+
+def compact_serial_interval(serial_interval, tolerance):
+    """
+    Trims the tail of a serial interval so that the removed probability mass
+    is at most ``tolerance`` of the total mass.
+
+    Only trailing values are removed, so the remaining values keep their
+    position (number of days after the infector displays symptoms). For a
+    2-dimensional array of serial intervals (one per row), all rows are
+    trimmed to the common length needed to satisfy the tolerance for every
+    one of them.
+
+    Parameters
+    ----------
+    serial_interval
+        (list or numpy array) Unnormalised probability distribution of that
+        the recipient first displays symptoms s days after the infector first
+        displays symptoms; or 2-dimensional array of such distributions.
+    tolerance
+        (float) maximum fraction of the total mass of the serial interval
+        which can be removed. Must be in [0, 1).
+
+    Returns
+    -------
+    tuple
+        The trimmed serial interval(s) and the fraction of mass removed from
+        each of them.
+    """
+    if not 0 <= tolerance < 1:
+        raise ValueError('Tolerance must be in [0, 1).')
+
+    serial_interval = np.asarray(serial_interval, dtype=float)
+    if serial_interval.ndim not in (1, 2):
+        raise ValueError(
+            'Serial interval values storage format must be 1- or '
+            '2-dimensional')
+
+    mass = np.sum(serial_interval, axis=-1, keepdims=True)
+
+    # Fraction of the mass lying strictly after each position
+    tail_mass = np.cumsum(
+        serial_interval[..., :0:-1], axis=-1)[..., ::-1] / mass
+    tail_mass = np.append(
+        tail_mass, np.zeros(tail_mass.shape[:-1] + (1,)), axis=-1)
+    length = np.argmax(
+        np.reshape(tail_mass, (-1, tail_mass.shape[-1])) <= tolerance,
+        axis=1) + 1
+    trimmed = serial_interval[..., :np.max(length)]
+
+    truncation_error = 1 - np.sum(trimmed, axis=-1) / mass[..., 0]
+
+    return trimmed, truncation_error
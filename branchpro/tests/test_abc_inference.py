@@ -0,0 +1,138 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+import scipy.stats
+
+import branchpro as bp
+from branchpro.abc_inference import _simulate_batch
+
+
+class TestLocImpBranchProABCClass(unittest.TestCase):
+    """
+    Test the 'LocImpBranchProABC' class.
+    """
+    def setUp(self):
+        self.model = bp.LocImpBranchProModel(2, [1, 2, 1], 0)
+        self.model.set_imported_cases([1, 3], [5, 2])
+        self.df = pd.DataFrame({
+            'Time': [0, 1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9, 12]
+        })
+        self.r_prior = scipy.stats.uniform(0, 4)
+        self.epsilon_prior = scipy.stats.uniform(-1, 3)
+
+    def test__init__(self):
+        bp.LocImpBranchProABC(
+            self.model, self.df, [0], self.r_prior, self.epsilon_prior)
+
+        with self.assertRaises(TypeError) as test_excep:
+            bp.LocImpBranchProABC(
+                bp.BranchProModel(2, [1, 2]), self.df, [0], self.r_prior,
+                self.epsilon_prior)
+        self.assertTrue('LocImpBranchProModel' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.LocImpBranchProABC(
+                bp.LocImpBranchProModel(2, [1, 2], 0), self.df, [0],
+                self.r_prior, self.epsilon_prior)
+        self.assertTrue('Imported cases' in str(test_excep.exception))
+
+        with self.assertRaises(TypeError) as test_excep:
+            bp.LocImpBranchProABC(
+                self.model, '0', [0], self.r_prior, self.epsilon_prior)
+        self.assertTrue('Incidence data has to' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.LocImpBranchProABC(
+                self.model, self.df, [0], self.r_prior, self.epsilon_prior,
+                time_key='t')
+        self.assertTrue('No time column' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.LocImpBranchProABC(
+                self.model, self.df, [0], self.r_prior, self.epsilon_prior,
+                inc_key='i')
+        self.assertTrue('No incidence column' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.LocImpBranchProABC(
+                self.model, self.df[1:], [0], self.r_prior,
+                self.epsilon_prior)
+        self.assertTrue('start at time 0' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.LocImpBranchProABC(
+                self.model, self.df, [[0]], self.r_prior, self.epsilon_prior)
+        self.assertTrue('1-dimensional' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.LocImpBranchProABC(
+                self.model, self.df, [3, 1], self.r_prior, self.epsilon_prior)
+        self.assertTrue('must be increasing' in str(test_excep.exception))
+
+    def test_simulate_batch(self):
+        # Zero reproduction number gives no new local cases
+        incidences = _simulate_batch(
+            np.array([1, 2, 1]) / 4, np.ones(6), 10, np.zeros((3, 5)),
+            np.zeros(3), 1)
+        npt.assert_array_equal(incidences[:, 0], [10] * 3)
+        npt.assert_array_equal(incidences[:, 1:], np.zeros((3, 5)))
+
+        # Batched means agree with the renewal equation of the model
+        incidences = _simulate_batch(
+            np.array([1.0]), np.zeros(2), 100, np.full((20000, 1), 2.0),
+            np.zeros(20000), 1)
+        self.assertAlmostEqual(np.mean(incidences[:, 1]), 200, delta=1)
+
+    def test_run_inference(self):
+        abc = bp.LocImpBranchProABC(
+            self.model, self.df, [0, 3], self.r_prior, self.epsilon_prior)
+
+        np.random.seed(1)
+        abc.run_inference(1000, accept_fraction=0.05, batch_size=300)
+
+        self.assertEqual(abc.accepted_r.shape, (50, 2))
+        self.assertEqual(abc.accepted_epsilon.shape, (50,))
+        self.assertEqual(abc.accepted_distances.shape, (50,))
+        self.assertEqual(abc.tolerance, np.max(abc.accepted_distances))
+
+        # Results do not depend on the number of processes used
+        np.random.seed(1)
+        abc.run_inference(
+            1000, accept_fraction=0.05, batch_size=300, n_workers=2)
+        np.random.seed(1)
+        abc_serial = bp.LocImpBranchProABC(
+            self.model, self.df, [0, 3], self.r_prior, self.epsilon_prior)
+        abc_serial.run_inference(1000, accept_fraction=0.05, batch_size=300)
+        npt.assert_array_equal(
+            np.sort(abc.accepted_distances),
+            np.sort(abc_serial.accepted_distances))
+
+        with self.assertRaises(ValueError):
+            abc.run_inference(1000, accept_fraction=0)
+
+    def test_get_intervals(self):
+        abc = bp.LocImpBranchProABC(
+            self.model, self.df, [0, 3], self.r_prior, self.epsilon_prior)
+        abc.run_inference(500, accept_fraction=0.1)
+        intervals_df = abc.get_intervals(.95)
+
+        self.assertListEqual(
+            intervals_df['Parameter'].to_list(), ['epsilon', 'R', 'R'])
+        self.assertListEqual(
+            intervals_df['Start Time'].to_list()[1:], [0, 3])
+        self.assertTrue(np.all(
+            intervals_df['Lower bound CI'] <= intervals_df['Mean']))
+        self.assertTrue(np.all(
+            intervals_df['Mean'] <= intervals_df['Upper bound CI']))
+        self.assertEqual(
+            intervals_df['Central Probability'].to_list(), [.95] * 3)
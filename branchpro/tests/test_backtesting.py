@@ -0,0 +1,107 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestBacktest(unittest.TestCase):
+    """
+    Test the 'backtest' function.
+    """
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Time': list(range(1, 13)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7, 3, 4, 8, 6]
+        })
+
+    def test_one_step(self):
+        posterior = bp.BranchProPosterior(self.df, [1, 2, 1], 1, 0.2)
+        backtest_df = bp.backtest(posterior, 2, central_prob=.9)
+
+        posterior.run_inference(2)
+        predictive_df = posterior.get_predictive_intervals(.9)[:-1]
+
+        npt.assert_array_equal(
+            backtest_df['Origin'], predictive_df['Time Points'] - 1)
+        for key in ['Time Points', 'Mean', 'Lower bound CI',
+                    'Upper bound CI', 'Observed']:
+            npt.assert_array_almost_equal(
+                backtest_df[key], predictive_df[key])
+        npt.assert_array_almost_equal(
+            backtest_df['Log Score'],
+            np.log(predictive_df['Observed Probability']))
+        npt.assert_array_equal(
+            backtest_df['Covered'],
+            (backtest_df['Lower bound CI'] <= backtest_df['Observed']) & (
+                backtest_df['Observed'] <= backtest_df['Upper bound CI']))
+
+    def test_multi_step(self):
+        posterior = bp.BranchProPosterior(self.df, [1, 2], 1, 0.2)
+        backtest_df = bp.backtest(
+            posterior, 3, horizons=[1, 2], origins=[6, 9],
+            num_samples=20000, seed=3)
+
+        self.assertEqual(backtest_df['Origin'].to_list(), [6, 6, 9, 9])
+        self.assertEqual(backtest_df['Horizon'].to_list(), [1, 2, 1, 2])
+        npt.assert_array_equal(backtest_df['Observed'], [5, 7, 4, 8])
+
+        # Mean of the second step with R constant over the forecast
+        shape = posterior.inference_posterior.args[0]
+        rate = 1 / posterior.inference_posterior.kwds['scale']
+        for origin, mean in zip([6, 9], backtest_df['Mean'][1::2]):
+            a, b = shape[origin - 5], rate[origin - 5]
+            previous = posterior.cases_data[origin - 2:origin]
+            first_step = (previous[1] + 2 * previous[0]) / 3
+            self.assertAlmostEqual(
+                mean / (a * (a + 1) / b ** 2 * first_step / 3 + (
+                    a / b * 2 * previous[1] / 3)), 1, delta=0.03)
+
+        # Seeds are drawn per origin, whatever the number of processes
+        pd.testing.assert_frame_equal(
+            backtest_df, bp.backtest(
+                posterior, 3, horizons=[1, 2], origins=[6, 9],
+                num_samples=20000, seed=3, n_workers=2))
+
+        # Forecasts past the end of the series are not scored
+        backtest_df = bp.backtest(
+            posterior, 3, horizons=[1, 3], origins=[10], seed=3)
+        self.assertEqual(backtest_df['Horizon'].to_list(), [1])
+
+    def test_local_imported(self):
+        imp_df = pd.DataFrame({
+            'Time': list(range(1, 13)),
+            'Incidence Number': [1, 0, 2, 5, 1, 3, 0, 0, 2, 1, 0, 3]
+        })
+        posterior = bp.LocImpBranchProPosterior(
+            self.df, imp_df, 0.5, [1, 2, 1], 1, 0.2)
+        backtest_df = bp.backtest(posterior, 2, horizons=[1, 2], seed=1)
+
+        posterior.run_inference(2)
+        predictive_df = posterior.get_predictive_intervals(.95)[:-1]
+        npt.assert_array_almost_equal(
+            backtest_df['Mean'][::2], predictive_df['Mean'])
+        self.assertTrue(np.all(np.isfinite(backtest_df['Mean'])))
+
+    def test_errors(self):
+        posterior = bp.BranchProPosterior(self.df, [1, 2, 1], 1, 0.2)
+
+        with self.assertRaises(ValueError):
+            bp.backtest(posterior, 2, horizons=[0, 1])
+
+        with self.assertRaises(ValueError):
+            bp.backtest(posterior, 2, origins=[2])
+
+        with self.assertRaises(TypeError):
+            bp.backtest(
+                bp.BranchProPosteriorMultSI(
+                    self.df, [[1, 2], [1, 1]], 1, 0.2), 2)
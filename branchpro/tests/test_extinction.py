@@ -0,0 +1,70 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestExtinctionProbability(unittest.TestCase):
+    """
+    Test the extinction probability functions.
+    """
+    def test_extinction_probability(self):
+        # Subcritical and critical outbreaks die out
+        self.assertEqual(
+            bp.extinction_probability(bp.BranchProModel(0.8, [1, 2]), 5), 1)
+        self.assertEqual(
+            bp.extinction_probability(bp.BranchProModel(1, [1, 2]), 5), 1)
+        self.assertEqual(
+            bp.extinction_probability(bp.BranchProModel(0, [1, 2]), 5), 1)
+
+        # Supercritical lineages die out at the fixed point
+        q = bp.extinction_probability(bp.BranchProModel(2, [1, 2]), 1)
+        self.assertAlmostEqual(q, np.exp(2 * (q - 1)))
+        self.assertAlmostEqual(q, 0.2031878699)
+        self.assertAlmostEqual(
+            bp.extinction_probability(bp.BranchProModel(2, [1, 2]), 3), q**3)
+
+        # Imported cases of a local and imported model
+        model = bp.LocImpBranchProModel(2, [1, 2], 0.5)
+        self.assertAlmostEqual(bp.extinction_probability(model, 1), q)
+        model.set_imported_cases([1, 4], [1, 2])
+        self.assertAlmostEqual(
+            bp.extinction_probability(model, 1), q * np.exp(9 * (q - 1)))
+
+        with self.assertRaises(TypeError):
+            bp.extinction_probability(bp.ForwardModel(), 1)
+
+    def test_extinction_probabilities(self):
+        probs = bp.extinction_probabilities([0.5, 2, 3], [1, 2])
+        self.assertEqual(probs.shape, (3, 2))
+        npt.assert_array_equal(probs[0], [1, 1])
+        npt.assert_array_almost_equal(
+            probs[1], [0.2031878699, 0.2031878699**2])
+        npt.assert_array_almost_equal(
+            probs[2, 0], np.exp(3 * (probs[2, 0] - 1)))
+
+        # Barely supercritical lineages match the expansion around R = 1
+        r = 1 + np.array([1e-9, 3e-8, 1e-6])
+        probs = bp.extinction_probabilities(r, [1])[:, 0]
+        self.assertTrue(np.all(probs < 1))
+        delta = r - 1
+        npt.assert_allclose(
+            1 - probs, 2 * delta - 8 * delta ** 2 / 3, rtol=1e-6)
+
+        with self.assertRaises(ValueError):
+            bp.extinction_probabilities([-1], [1])
+
+        with self.assertRaises(ValueError):
+            bp.extinction_probabilities([[1]], [1])
+
+        with self.assertRaises(ValueError):
+            bp.extinction_probabilities([1], 1)
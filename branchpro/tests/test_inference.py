@@ -0,0 +1,71 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import pandas as pd
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestBranchProInferenceAppClass(unittest.TestCase):
+    """
+    Test the 'BranchProInferenceApp' class.
+    """
+    def test_update_posterior(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [10, 3, 4, 6, 9, 5]
+        })
+        ser_int = pd.DataFrame({'Serial Interval': [1, 2, 1]})
+
+        app = bp.BranchProInferenceApp()
+        app.session_data['data_storage'] = df
+        app.session_data['interval_storage'] = ser_int
+        app.update_posterior(1, 1, 2, 0.9)
+        posterior = app._posterior_cache[2]
+
+        # Changing the prior or tau reuses the posterior
+        intervals = app.update_posterior(2, 0.5, 1, 0.9)
+        self.assertIs(app._posterior_cache[2], posterior)
+
+        new_posterior = bp.BranchProPosterior(df, [1, 2, 1], 16, 8)
+        new_posterior.run_inference(1)
+        npt.assert_array_almost_equal(
+            intervals['Mean'], new_posterior.inference_estimates)
+
+        # Changing the data or the serial interval rebuilds it
+        app.session_data['data_storage'] = df.assign(
+            **{'Incidence Number': [10, 3, 4, 6, 9, 8]})
+        app.update_posterior(2, 0.5, 1, 0.9)
+        self.assertIsNot(app._posterior_cache[2], posterior)
+        posterior = app._posterior_cache[2]
+
+        app.session_data['interval_storage'] = pd.DataFrame(
+            {'Serial Interval': [1, 3, 1]})
+        app.update_posterior(2, 0.5, 1, 0.9)
+        self.assertIsNot(app._posterior_cache[2], posterior)
+
+        # A posterior with imported cases picks up the new epsilon
+        imp_df = df.assign(**{'Imported Cases': [1, 0, 2, 0, 1, 3]})
+        app.session_data['data_storage'] = imp_df
+        app.session_data['interval_storage'] = ser_int
+        app.update_posterior(1, 1, 2, 0.9, epsilon=0.5)
+        posterior = app._posterior_cache[2]
+
+        intervals = app.update_posterior(1, 1, 2, 0.9, epsilon=1.5)
+        self.assertIs(app._posterior_cache[2], posterior)
+        self.assertEqual(posterior.epsilon, 1.5)
+
+        new_posterior = bp.LocImpBranchProPosterior(
+            df, imp_df[['Time', 'Imported Cases']].rename(
+                columns={'Imported Cases': 'Incidence Number'}),
+            1.5, [1, 2, 1], 1, 1)
+        new_posterior.run_inference(2)
+        npt.assert_array_almost_equal(
+            intervals['Mean'], new_posterior.inference_estimates)
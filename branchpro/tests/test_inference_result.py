@@ -0,0 +1,149 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestInferenceResultClass(unittest.TestCase):
+    """
+    Test the 'InferenceResult' class.
+    """
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [10, 3, 4, 6, 9, 2]
+        })
+
+    def test__init__(self):
+        result = bp.InferenceResult(3, [2, 3], [1, 1], (1, 0.2), 2)
+        self.assertEqual(result.shape.dtype, float)
+        self.assertTrue(result.rate.flags['C_CONTIGUOUS'])
+        self.assertIsNone(result.epsilon)
+
+        # Attributes are fixed
+        with self.assertRaises(AttributeError):
+            result.inference_times = [3, 4]
+
+        with self.assertRaises(ValueError):
+            bp.InferenceResult(3, [2, 3], [1], (1, 0.2), 2)
+
+        with self.assertRaises(ValueError):
+            bp.InferenceResult(3, [[2, 3]], [[1, 1]], (1, 0.2), 2)
+
+    def test_get_inference_result(self):
+        inference = bp.BranchProPosterior(self.df, [1, 2, 1], 1, 0.2)
+
+        with self.assertRaises(ValueError):
+            inference.get_inference_result()
+
+        inference.run_inference(2)
+        result = inference.get_inference_result()
+
+        npt.assert_array_equal(result.get_times(), inference.inference_times)
+        npt.assert_array_almost_equal(
+            result.mean(), inference.inference_estimates)
+        npt.assert_array_almost_equal(
+            result.get_posterior().std(), inference.inference_posterior.std())
+        self.assertEqual(result.prior_parameters, (1, 0.2))
+        self.assertEqual(result.tau, 2)
+        pd.testing.assert_frame_equal(
+            result.get_intervals(.9), inference.get_intervals(.9))
+
+        imp_df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [1, 0, 2, 5, 1, 3]
+        })
+        inference = bp.LocImpBranchProPosterior(
+            self.df, imp_df, 0.3, [1, 2, 1], 1, 0.2)
+        inference.run_inference(2)
+        self.assertEqual(inference.get_inference_result().epsilon, 0.3)
+
+        # The settings are the ones of the inference, not the current ones
+        result = inference.get_inference_result()
+        inference.set_epsilon(2.0)
+        inference.prior_parameters = (7, 7)
+        inference.set_serial_intervals([5, 1])
+        changed = inference.get_inference_result()
+        for key in ['prior_parameters', 'tau', 'epsilon',
+                    'serial_interval_hash']:
+            self.assertEqual(getattr(changed, key), getattr(result, key))
+        npt.assert_array_equal(changed.mean(), result.mean())
+
+        # Mixture posteriors are not Gamma-shaped
+        inference.run_inference_epsilon_marginal(2, [0, 1])
+        with self.assertRaises(ValueError):
+            inference.get_inference_result()
+
+        inference = bp.BranchProPosteriorMultSI(
+            self.df, [[1, 2], [1, 1]], 1, 0.2)
+        inference.run_inference(2)
+        with self.assertRaises(ValueError):
+            inference.get_inference_result()
+
+    def test_quantiles(self):
+        result = bp.InferenceResult(
+            3, np.array([2, 3, 8]), np.array([1, 4, 2]), (1, 0.2), 2)
+        npt.assert_array_almost_equal(
+            result.quantiles([.1, .5]),
+            result.get_posterior().ppf(np.array([[.1], [.5]])))
+
+    def test_save_load(self):
+        inference = bp.BranchProPosterior(self.df, [1, 2, 1], 1, 0.2)
+        inference.run_inference(2)
+        result = inference.get_inference_result()
+
+        imp_df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [1, 0, 2, 5, 1, 3]
+        })
+        inference = bp.LocImpBranchProPosterior(
+            self.df, imp_df, 0.3, [2, 4, 2], 1, 0.2)
+        inference.run_inference(1)
+
+        # Settings changed after the inference are not saved
+        inference.set_epsilon(2.0)
+        inference.prior_parameters = (7, 7)
+        inference.set_serial_intervals([5, 1])
+        imp_result = inference.get_inference_result()
+        self.assertEqual(imp_result.epsilon, 0.3)
+        self.assertEqual(imp_result.prior_parameters, (1, 0.2))
+
+        # Same kernel once normalised
+        self.assertEqual(
+            result.serial_interval_hash, imp_result.serial_interval_hash)
+
+        results = {'a': result, 3: imp_result}
+        with tempfile.TemporaryDirectory() as directory:
+            directory = os.path.join(directory, 'results')
+            bp.save_inference_results(directory, results)
+
+            for mmap_mode in ['r', None]:
+                loaded = bp.load_inference_results(directory, mmap_mode)
+                self.assertEqual(list(loaded), ['a', '3'])
+                for original, copy in zip(
+                        results.values(), loaded.values()):
+                    npt.assert_array_equal(copy.shape, original.shape)
+                    npt.assert_array_equal(copy.rate, original.rate)
+                    npt.assert_array_equal(
+                        copy.get_times(), original.get_times())
+                    for key in ['prior_parameters', 'tau', 'epsilon',
+                                'serial_interval_hash']:
+                        self.assertEqual(
+                            getattr(copy, key), getattr(original, key))
+
+                # Memory-mapped results are read-only views of the files
+                self.assertEqual(
+                    loaded['a'].shape.flags['WRITEABLE'], mmap_mode is None)
+                del loaded
@@ -45,6 +45,11 @@ class TestBrachProModelClass(unittest.TestCase):
         npt.assert_array_equal(
             br_model.get_serial_intervals(), np.array([1, 2]))
 
+        br_model = bp.BranchProModel(0, [1, 2, 0.01], si_tolerance=0.01)
+        npt.assert_array_equal(
+            br_model.get_serial_intervals(), np.array([1, 2]))
+        self.assertAlmostEqual(br_model.si_truncation_error, 0.01 / 3.01)
+
     def test_get_r_profile(self):
         br_model1 = bp.BranchProModel(0, [1, 2])
         br_model1.set_r_profile([1], [2])
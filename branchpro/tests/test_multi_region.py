@@ -0,0 +1,131 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestMultiRegionBranchProPosteriorClass(unittest.TestCase):
+    """
+    Test the 'MultiRegionBranchProPosterior' class.
+    """
+    def setUp(self):
+        self.cases = np.array([
+            [10, 3, 4, 0, 6, 9, 2, 0, 5],
+            [1, 0, 2, 5, 0, 1, 3, 2, 2],
+            [0, 4, 4, 1, 7, 0, 0, 3, 8]])
+        self.imported = np.array([
+            [1, 0, 2, 0, 1, 0, 0, 1, 0],
+            [0, 0, 0, 3, 0, 1, 0, 0, 2],
+            [2, 1, 0, 0, 0, 0, 1, 0, 0]])
+        self.times = np.arange(1, 10)
+
+    def test__init__(self):
+        bp.MultiRegionBranchProPosterior(self.cases, [1, 2], 1, 0.2)
+
+        with self.assertRaises(ValueError):
+            bp.MultiRegionBranchProPosterior(self.cases[0], [1, 2], 1, 0.2)
+
+        with self.assertRaises(ValueError):
+            bp.MultiRegionBranchProPosterior(
+                self.cases, [1, 2], 1, 0.2, imported_inc_data=self.imported[0])
+
+        with self.assertRaises(ValueError):
+            bp.MultiRegionBranchProPosterior(
+                self.cases, [1, 2], 1, 0.2, times=[1, 2, 4])
+
+        with self.assertRaises(ValueError):
+            bp.MultiRegionBranchProPosterior(
+                self.cases, [1, 2], 1, 0.2, regions=['a'])
+
+        with self.assertRaises(ValueError):
+            bp.MultiRegionBranchProPosterior(
+                self.cases, [[1, 2], [1, 1]], 1, 0.2)
+
+        with self.assertRaises(ValueError):
+            bp.MultiRegionBranchProPosterior(
+                self.cases, [1, 2], 1, 0.2, epsilon=-2)
+
+    def test_run_inference(self):
+        ser_int = [1, 2, 1]
+
+        inference = bp.MultiRegionBranchProPosterior(
+            self.cases, ser_int, 1, 0.2, times=self.times)
+        inference.run_inference(2)
+
+        for cases, shape, scale in zip(
+                self.cases, inference.inference_posterior.args[0],
+                inference.inference_posterior.kwds['scale']):
+            df = pd.DataFrame({'Time': self.times, 'Incidence Number': cases})
+            single = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+            single.run_inference(2)
+
+            self.assertEqual(inference.inference_times, single.inference_times)
+            npt.assert_array_almost_equal(
+                shape, single.inference_posterior.args[0])
+            npt.assert_array_almost_equal(
+                scale, single.inference_posterior.kwds['scale'])
+
+        # Per-region serial intervals and imported cases
+        ser_ints = [[1, 2, 1], [1, 0, 0], [0.5, 1, 3]]
+
+        inference = bp.MultiRegionBranchProPosterior(
+            self.cases, ser_ints, 1, 0.2, imported_inc_data=self.imported,
+            epsilon=0.3, times=self.times)
+        inference.run_inference(3)
+
+        for cases, imported, si, scale in zip(
+                self.cases, self.imported, ser_ints,
+                inference.inference_posterior.kwds['scale']):
+            df = pd.DataFrame({'Time': self.times, 'Incidence Number': cases})
+            imp_df = pd.DataFrame(
+                {'Time': self.times, 'Incidence Number': imported})
+            single = bp.LocImpBranchProPosterior(df, imp_df, 0.3, si, 1, 0.2)
+            single.run_inference(3)
+
+            npt.assert_array_almost_equal(
+                scale, single.inference_posterior.kwds['scale'])
+
+        # FFT infectiousness
+        inference.fft_threshold = 1
+        fft_infectiousness = inference._infectiousness(self.cases)
+        inference.fft_threshold = 300
+        npt.assert_array_almost_equal(
+            fft_infectiousness, inference._infectiousness(self.cases))
+
+    def test_get_intervals(self):
+        inference = bp.MultiRegionBranchProPosterior(
+            self.cases, [1, 2], 1, 0.2, regions=['a', 'b', 'c'])
+        inference.run_inference(3)
+        intervals_df = inference.get_intervals(.95)
+
+        self.assertEqual(len(intervals_df), 15)
+        self.assertEqual(
+            intervals_df['Region'].to_list(),
+            ['a'] * 5 + ['b'] * 5 + ['c'] * 5)
+        self.assertEqual(
+            intervals_df['Time Points'].to_list(), [4, 5, 6, 7, 8] * 3)
+        self.assertTrue(np.all(
+            intervals_df['Lower bound CI'] <= intervals_df['Mean']))
+        self.assertTrue(np.all(
+            intervals_df['Mean'] <= intervals_df['Upper bound CI']))
+
+        # Each region matches the intervals of a single posterior
+        df = pd.DataFrame(
+            {'Time': np.arange(9), 'Incidence Number': self.cases[1]})
+        single = bp.BranchProPosterior(df, [1, 2], 1, 0.2)
+        single.run_inference(3)
+        single_df = single.get_intervals(.95)
+        region_df = intervals_df[intervals_df['Region'] == 'b']
+        for column in ['Mean', 'Lower bound CI', 'Upper bound CI']:
+            npt.assert_array_almost_equal(
+                region_df[column], single_df[column])
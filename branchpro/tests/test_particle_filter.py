@@ -0,0 +1,145 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import pandas as pd
+import numpy as np
+import numpy.testing as npt
+import scipy.special
+
+import branchpro as bp
+
+
+class TestBranchProParticleFilterClass(unittest.TestCase):
+    """
+    Test the 'BranchProParticleFilter' class.
+    """
+    def test__init__(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        ser_int = [1, 2]
+
+        bp.BranchProParticleFilter(df, ser_int, 1, 0.2)
+
+        with self.assertRaises(TypeError) as test_excep:
+            bp.BranchProParticleFilter('0', ser_int, 1, 0.2)
+        self.assertTrue('Incidence data has to' in str(test_excep.exception))
+
+        with self.assertRaises(ValueError) as test_excep:
+            bp.BranchProParticleFilter(df, ser_int, 1, 0.2, sigma=-1)
+        self.assertTrue('non-negative' in str(test_excep.exception))
+
+    def test_run_inference(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        ser_int = [1, 2]
+
+        inference = bp.BranchProParticleFilter(df, ser_int, 1, 0.2)
+        inference.run_inference(num_particles=50)
+
+        self.assertEqual(inference.inference_times, [2, 3, 4, 5, 6])
+        self.assertEqual(inference._filtered_particles.shape, (5, 50))
+        self.assertTrue(np.isfinite(inference.log_likelihood))
+
+        # Without a random walk, the likelihood estimates average to the
+        # likelihood of the data with R integrated over its Gamma prior
+        inference = bp.BranchProParticleFilter(df, ser_int, 1, 0.2, sigma=0)
+        np.random.seed(1)
+        log_likelihoods = []
+        for _ in range(50):
+            inference.run_inference(num_particles=2000)
+            log_likelihoods.append(inference.log_likelihood)
+        observed = inference.cases_data[1:]
+        lam = inference._infectiousness(inference.cases_data)[1:]
+        exact = (
+            np.sum(observed * np.log(lam) - scipy.special.gammaln(
+                observed + 1)) + np.log(0.2) - scipy.special.gammaln(1) +
+            scipy.special.gammaln(1 + np.sum(observed)) -
+            (1 + np.sum(observed)) * np.log(0.2 + np.sum(lam)))
+        self.assertAlmostEqual(
+            np.log(np.mean(np.exp(log_likelihoods))), exact, delta=0.05)
+
+        # Cases without any infectiousness are impossible
+        inference = bp.BranchProParticleFilter(
+            np.array([0, 0, 3, 1]), [1], 1, 0.2)
+        inference.run_inference(num_particles=50)
+        self.assertEqual(inference.log_likelihood, -np.inf)
+
+        # Without a random walk and with constant incidence the filter
+        # concentrates around R = 1
+        df = pd.DataFrame({
+            'Time': np.arange(1, 201),
+            'Incidence Number': [100] * 200
+        })
+        inference = bp.BranchProParticleFilter(df, [1], 1, 0.2, sigma=0.02)
+        np.random.seed(1)
+        inference.run_inference(num_particles=2000)
+        intervals_df = inference.get_intervals(.95)
+        self.assertAlmostEqual(
+            intervals_df['Mean'].to_numpy()[-1], 1, delta=0.05)
+
+    def test_run_inference_multi_tau(self):
+        inference = bp.BranchProParticleFilter(
+            np.array([10, 3, 4, 0, 6, 9]), [1, 2], 1, 0.2)
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_multi_tau([1, 2])
+
+        with self.assertRaises(ValueError):
+            inference.log_predictive_likelihood([1, 2])
+
+        with self.assertRaises(ValueError):
+            inference.select_tau([1, 2])
+
+    def test_get_predictive_intervals(self):
+        inference = bp.BranchProParticleFilter(
+            np.array([10, 3, 4, 0, 6, 9]), [1, 2], 1, 0.2)
+        inference.run_inference(num_particles=100)
+
+        with self.assertRaises(ValueError):
+            inference.get_predictive_intervals(.95)
+
+    def test_append(self):
+        inference = bp.BranchProParticleFilter(
+            np.array([10, 3, 4, 0, 6, 9]), [1, 2], 1, 0.2)
+        inference.run_inference(num_particles=100)
+
+        with self.assertRaises(ValueError):
+            inference.append(6, 5)
+        self.assertEqual(len(inference.cases_data), 6)
+
+    def test_get_intervals(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        ser_int = [1, 2]
+
+        inference = bp.BranchProParticleFilter(df, ser_int, 1, 0.2)
+        inference.run_inference(num_particles=100)
+
+        for smoothed in [False, True]:
+            intervals_df = inference.get_intervals(.95, smoothed=smoothed)
+
+            self.assertEqual(len(intervals_df['Time Points']), 5)
+            self.assertEqual(len(intervals_df['Mean']), 5)
+            self.assertTrue(np.all(
+                intervals_df['Lower bound CI'] <= intervals_df['Mean']))
+            self.assertTrue(np.all(
+                intervals_df['Mean'] <= intervals_df['Upper bound CI']))
+            self.assertEqual(
+                intervals_df['Central Probability'].to_list(), [.95] * 5)
+
+        # The smoothed and filtered estimates coincide on the last day
+        npt.assert_array_equal(
+            inference._smoothed_particles()[-1],
+            inference._filtered_particles[-1])
@@ -10,6 +10,7 @@ import unittest
 import pandas as pd
 import numpy as np
 import numpy.testing as npt
+import scipy.stats
 
 import branchpro as bp
 
@@ -48,6 +49,60 @@ class TestBranchProPosteriorClass(unittest.TestCase):
             bp.BranchProPosterior(df, ser_int, 1, 0.2, inc_key='i')
         self.assertTrue('No incidence column' in str(test_excep.exception))
 
+    def test__init__arrays(self):
+        cases = np.array([10, 3, 4, 0, 6, 9])
+        ser_int = [1, 2, 1]
+
+        # Arrays are used as they are, without copies
+        inference = bp.BranchProPosterior(cases, ser_int, 1, 0.2, time_start=1)
+        self.assertIs(inference.cases_data, cases)
+        npt.assert_array_equal(inference.cases_times, [1, 2, 3, 4, 5, 6])
+
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        df_inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        inference.run_inference(2)
+        df_inference.run_inference(2)
+        self.assertEqual(
+            inference.inference_times, df_inference.inference_times)
+        npt.assert_array_almost_equal(
+            inference.inference_posterior.kwds['scale'],
+            df_inference.inference_posterior.kwds['scale'])
+
+        inference.append(8, 5)
+        npt.assert_array_equal(
+            inference.cases_times, [1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(inference.inference_times[-1], 8)
+
+        inference = bp.BranchProPosterior(cases, ser_int, 1, 0.2)
+        self.assertEqual(inference.cases_times[0], 0)
+
+        # Changes made in place to a shared array are not hidden by the cache
+        inference.run_inference(2)
+        cases[:] = cases * 3
+        inference.run_inference(2)
+        new_inference = bp.BranchProPosterior(cases.copy(), ser_int, 1, 0.2)
+        new_inference.run_inference(2)
+        npt.assert_array_almost_equal(
+            inference.inference_estimates, new_inference.inference_estimates)
+
+        cases = np.array([10, 3, 4, 0, 6, 9])
+        inference = bp.BranchProPosteriorMultSI(
+            cases, [[1, 2, 1], [0, 1, 1]], 1, 0.2)
+        inference.run_inference(2)
+        cases[:] = cases[::-1]
+        inference.run_inference(2)
+        new_inference = bp.BranchProPosteriorMultSI(
+            cases.copy(), [[1, 2, 1], [0, 1, 1]], 1, 0.2)
+        new_inference.run_inference(2)
+        npt.assert_array_almost_equal(
+            inference._posterior_rates, new_inference._posterior_rates)
+
+        with self.assertRaises(ValueError):
+            bp.BranchProPosterior(cases[np.newaxis], ser_int, 1, 0.2)
+
     def test_get_serial_intervals(self):
         df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -59,6 +114,12 @@ class TestBranchProPosteriorClass(unittest.TestCase):
         npt.assert_array_equal(
             inference.get_serial_intervals(), np.array([1, 2]))
 
+        inference = bp.BranchProPosterior(
+            df, [1, 2, 0.01, 0], 1, 0.2, si_tolerance=0.01)
+        npt.assert_array_equal(
+            inference.get_serial_intervals(), np.array([1, 2]))
+        self.assertAlmostEqual(inference.si_truncation_error, 0.01 / 3.01)
+
     def test_set_serial_intervals(self):
         df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -77,6 +138,51 @@ class TestBranchProPosteriorClass(unittest.TestCase):
         with self.assertRaises(ValueError):
             inference.set_serial_intervals(wrong_ser_int)
 
+    def test_infectiousness(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        ser_int = [1, 2, 1]
+
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        npt.assert_array_almost_equal(
+            inference._infectiousness(inference.cases_data),
+            [0] + [inference._infectious_individuals(inference.cases_data, t)
+                   for t in range(2, 7)])
+
+        # FFT convolution agrees with the direct one
+        direct = inference._infectiousness(inference.cases_data)
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        inference.fft_threshold = 1
+        npt.assert_array_almost_equal(
+            inference._infectiousness(inference.cases_data), direct)
+
+        # Results are cached until the serial interval changes
+        self.assertIs(
+            inference._infectiousness(inference.cases_data),
+            inference._infectiousness(inference.cases_data))
+        inference.set_serial_intervals([1])
+        npt.assert_array_almost_equal(
+            inference._infectiousness(inference.cases_data),
+            [0, 10, 3, 4, 0, 6])
+
+    def test_window_sums(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        ser_int = [1, 2]
+
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        cum_cases = inference._prefix_sums(inference.cases_data)[0]
+        npt.assert_array_equal(cum_cases, [0, 10, 13, 17, 17, 23, 32])
+        npt.assert_array_equal(
+            inference._window_sums(cum_cases, 2), [7, 10, 15])
+        npt.assert_array_equal(inference._window_sums(cum_cases, 5), [])
+        npt.assert_array_equal(
+            inference._last_window_sums(cum_cases, 2, 2), [10, 15])
+
     def test_run_inference(self):
         df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -99,6 +205,247 @@ class TestBranchProPosteriorClass(unittest.TestCase):
         self.assertEqual(len(inference2.inference_times), 3)
         self.assertEqual(len(inference2.inference_posterior.mean()), 3)
 
+        # Sums are reused across priors and windows until the serial
+        # interval changes
+        sums = inference2._prefix_sums(inference2.cases_data)
+        inference2.prior_parameters = (2, 1)
+        inference2.run_inference(tau=1)
+        self.assertIs(
+            inference2._prefix_sums(inference2.cases_data)[1], sums[1])
+        inference2.set_serial_intervals(ser_int1)
+        self.assertEqual(len(inference2._infectiousness_cache), 0)
+        inference2.set_serial_intervals(ser_int2)
+        inference2.prior_parameters = (1, 0.2)
+        inference2.run_inference(tau=2)
+
+        # Posterior parameters of each window of the renewal equation
+        shape, rate = inference2.inference_posterior.args[0], 1 / (
+            inference2.inference_posterior.kwds['scale'])
+        npt.assert_array_almost_equal(shape, [8, 11, 16])
+        npt.assert_array_almost_equal(
+            rate, [0.2 + 43 / 3, 0.2 + 41 / 3, 0.2 + 8])
+
+    def test_run_inference_multi_tau(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7, 9],
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5]
+        })
+        ser_int = [1, 2, 1]
+
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        times, shape, rate = inference.run_inference_multi_tau([3, 1, 2])
+
+        npt.assert_array_equal(times, [3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(shape.shape, (3, 7))
+        self.assertEqual(rate.shape, (3, 7))
+
+        for tau, tau_shape, tau_rate in zip([3, 1, 2], shape, rate):
+            inference.run_inference(tau)
+            tau_shape = tau_shape[~np.isnan(tau_shape)]
+            tau_rate = tau_rate[~np.isnan(tau_rate)]
+            npt.assert_array_almost_equal(
+                tau_shape, inference.inference_posterior.args[0])
+            npt.assert_array_almost_equal(
+                1 / tau_rate, inference.inference_posterior.kwds['scale'])
+            self.assertEqual(len(tau_shape), len(inference.inference_times))
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_multi_tau([[1]])
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_multi_tau([-1])
+
+    def test_get_predictive_intervals(self):
+        df = pd.DataFrame({
+            'Time': list(range(1, 11)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7, 3, 4]
+        })
+        ser_int = [1, 2, 1]
+
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        inference.run_inference(2)
+        predictive_df = inference.get_predictive_intervals(.9)
+
+        npt.assert_array_equal(
+            predictive_df['Time Points'], [5, 6, 7, 8, 9, 10, 11])
+        npt.assert_array_equal(
+            predictive_df['Observed'], [9, 2, 5, 7, 3, 4, np.nan])
+        self.assertTrue(np.isnan(predictive_df['Observed Probability'][6]))
+
+        # Negative binomial predictive, with the infectiousness of the time
+        # point following the data for the last window
+        shape = inference.inference_posterior.args[0]
+        rate = 1 / inference.inference_posterior.kwds['scale']
+        infectiousness = np.append(
+            inference._infectiousness(inference.cases_data)[4:],
+            (4 + 2 * 3 + 7) / 4)
+        predictive = scipy.stats.nbinom(
+            shape, rate / (rate + infectiousness))
+
+        npt.assert_array_almost_equal(
+            predictive_df['Mean'], predictive.mean())
+        npt.assert_array_almost_equal(
+            predictive_df['Lower bound CI'], predictive.ppf(.05))
+        npt.assert_array_almost_equal(
+            predictive_df['Upper bound CI'], predictive.ppf(.95))
+        npt.assert_array_almost_equal(
+            predictive_df['Observed Probability'][:6],
+            predictive.pmf([9, 2, 5, 7, 3, 4, 0])[:6])
+
+    def test_log_predictive_likelihood(self):
+        df = pd.DataFrame({
+            'Time': list(range(1, 11)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7, 3, 4]
+        })
+        ser_int = [1, 2, 1]
+
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        times, log_likelihood = inference.log_predictive_likelihood([1, 3])
+        npt.assert_array_equal(times, [4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(log_likelihood.shape, (2, 7))
+        self.assertTrue(np.all(np.isnan(log_likelihood[1, :2])))
+
+        # Negative binomial predictive of the next incidence number
+        infectiousness = inference._infectiousness(inference.cases_data)
+        for tau, tau_log_likelihood in zip([1, 3], log_likelihood):
+            inference.run_inference(tau)
+            shape = inference.inference_posterior.args[0][:-1]
+            rate = 1 / inference.inference_posterior.kwds['scale'][:-1]
+            next_infectiousness = infectiousness[(tau + 2):]
+            npt.assert_array_almost_equal(
+                tau_log_likelihood[~np.isnan(tau_log_likelihood)],
+                scipy.stats.nbinom.logpmf(
+                    inference.cases_data[(tau + 2):], shape,
+                    rate / (rate + next_infectiousness)))
+
+    def test_select_tau(self):
+        df = pd.DataFrame({
+            'Time': list(range(1, 11)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7, 3, 4]
+        })
+        ser_int = [1, 2, 1]
+
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        candidates = [1, 2, 3, 4]
+        _, log_likelihood = inference.log_predictive_likelihood(candidates)
+        scores = np.sum(log_likelihood[:, 3:], axis=1)
+        self.assertEqual(
+            inference.select_tau(candidates), candidates[np.argmax(scores)])
+
+        with self.assertRaises(ValueError):
+            inference.select_tau([1, 8])
+
+        inference.prior_parameters = ([1, 2], 0.2)
+        with self.assertRaises(ValueError):
+            inference.select_tau(candidates)
+
+    def test_prior_grid(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7, 9],
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5]
+        })
+        ser_int = [1, 2, 1]
+        alphas = np.array([1, 2, 5])
+        betas = np.array([0.2, 1])
+
+        inference = bp.BranchProPosterior(
+            df, ser_int, alphas[:, np.newaxis], betas[np.newaxis, :])
+        inference.run_inference(2)
+        shape = inference.inference_posterior.args[0]
+        scale = inference.inference_posterior.kwds['scale']
+        self.assertEqual(inference.inference_estimates.shape, (3, 2, 6))
+
+        for i, alpha in enumerate(alphas):
+            for j, beta in enumerate(betas):
+                single = bp.BranchProPosterior(df, ser_int, alpha, beta)
+                single.run_inference(2)
+                npt.assert_array_almost_equal(
+                    np.broadcast_to(shape, (3, 2, 6))[i, j],
+                    single.inference_posterior.args[0])
+                npt.assert_array_almost_equal(
+                    np.broadcast_to(scale, (3, 2, 6))[i, j],
+                    single.inference_posterior.kwds['scale'])
+
+        intervals_df = inference.get_intervals(.95)
+        self.assertEqual(len(intervals_df), 36)
+        self.assertEqual(intervals_df['Prior Shape'].to_list()[:12], [1] * 12)
+        self.assertEqual(
+            intervals_df['Prior Rate'].to_list()[:12], [0.2] * 6 + [1] * 6)
+
+        times, shape, rate = inference.run_inference_multi_tau([1, 2])
+        self.assertEqual(shape.shape, (3, 2, 2, 7))
+
+        # Prior moments
+        inference.set_prior_moments([1, 2], 2)
+        npt.assert_array_almost_equal(inference.prior_parameters[0], [.25, 1])
+        npt.assert_array_almost_equal(inference.prior_parameters[1], [.25, .5])
+        inference.run_inference(2)
+        self.assertEqual(inference.inference_estimates.shape, (2, 6))
+
+        with self.assertRaises(ValueError):
+            inference.set_prior_moments(1, 0)
+
+    def test_append(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7, 9],
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5]
+        })
+        ser_int = [1, 2, 1]
+
+        full = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        full.run_inference(tau=2)
+
+        # Data appended after the inference extends its results
+        inference = bp.BranchProPosterior(df[:4], ser_int, 1, 0.2)
+        inference.run_inference(tau=2)
+        inference.append(6, 9)
+        inference.append(7, 2)
+        inference.append(9, 5)
+
+        npt.assert_array_equal(inference.cases_data, full.cases_data)
+        self.assertListEqual(
+            inference.cases_times.to_list(), full.cases_times.to_list())
+        self.assertListEqual(inference.inference_times, full.inference_times)
+        npt.assert_array_almost_equal(
+            inference.inference_estimates, full.inference_estimates)
+        npt.assert_array_almost_equal(
+            inference.inference_posterior.interval(.9),
+            full.inference_posterior.interval(.9))
+
+        # Data appended before the inference is used by it
+        inference = bp.BranchProPosterior(df[:2], ser_int, 1, 0.2)
+        inference.run_inference(tau=2)
+        self.assertListEqual(inference.inference_times, [])
+        for time, count in zip([3, 5, 6, 7, 9], [4, 6, 9, 2, 5]):
+            inference.append(time, count)
+        npt.assert_array_almost_equal(
+            inference.inference_estimates, full.inference_estimates)
+
+        # Later appends are written in place after the previous values,
+        # leaving the arrays returned before unchanged
+        cases_data = inference.cases_data
+        estimates = inference.inference_estimates
+        inference.append(10, 7)
+        self.assertTrue(np.shares_memory(cases_data, inference.cases_data))
+        self.assertTrue(np.shares_memory(
+            estimates, inference.inference_estimates))
+        npt.assert_array_equal(cases_data, full.cases_data)
+        npt.assert_array_almost_equal(estimates, full.inference_estimates)
+        full = bp.BranchProPosterior(
+            np.append(full.cases_data, 7), ser_int, 1, 0.2, time_start=1)
+        full.run_inference(tau=2)
+        npt.assert_array_almost_equal(
+            inference.inference_estimates, full.inference_estimates)
+        npt.assert_array_almost_equal(
+            inference.inference_posterior.mean(),
+            full.inference_posterior.mean())
+
+        with self.assertRaises(ValueError):
+            inference.append(9, 1)
+
+        with self.assertRaises(TypeError):
+            inference.append(10.5, 1)
+
     def test_get_intervals(self):
         df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -120,6 +467,35 @@ class TestBranchProPosteriorClass(unittest.TestCase):
         self.assertEqual(
             intervals_df['Central Probability'].to_list(), [.95] * 3)
 
+        # Several levels at once, matching the Gamma-shaped posterior
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        inference = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+        inference.run_inference(tau=2)
+        intervals_df = inference.get_intervals([.5, .95])
+
+        self.assertEqual(
+            intervals_df['Central Probability'].to_list(),
+            [.5] * 3 + [.95] * 3)
+        for level, level_df in intervals_df.groupby('Central Probability'):
+            lower, upper = inference.inference_posterior.interval(level)
+            npt.assert_array_almost_equal(level_df['Lower bound CI'], lower)
+            npt.assert_array_almost_equal(level_df['Upper bound CI'], upper)
+        pd.testing.assert_frame_equal(
+            inference.get_intervals(.95),
+            intervals_df.iloc[3:].reset_index(drop=True))
+
+        # Intervals are cached until the inference is run again
+        cache = inference._intervals_cache[1]
+        self.assertEqual(list(cache), [.5, .95])
+        inference.get_intervals(.9)
+        self.assertIs(inference._intervals_cache[1], cache)
+        inference.run_inference(tau=1)
+        self.assertEqual(len(inference.get_intervals(.95)), 4)
+        self.assertEqual(list(inference._intervals_cache[1]), [.95])
+
 
 #
 # TestBranchProPosteriorMultSI Class
@@ -159,6 +535,11 @@ class TestBranchProPosteriorMultSIClass(unittest.TestCase):
         npt.assert_array_equal(
             inference.get_serial_intervals(), np.array([[1, 2], [0, 1]]))
 
+        inference = bp.BranchProPosteriorMultSI(
+            df, [[1, 2, 0], [0, 1, 0]], 1, 0.2, si_tolerance=0)
+        npt.assert_array_equal(
+            inference.get_serial_intervals(), np.array([[1, 2], [0, 1]]))
+
     def test_set_serial_intervals(self):
         df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -200,6 +581,142 @@ class TestBranchProPosteriorMultSIClass(unittest.TestCase):
         self.assertEqual(len(inference2.inference_times), 3)
         self.assertEqual(len(inference2.inference_posterior.mean()), 3)
 
+        # Each serial interval gives the posterior of a single one, without
+        # changing the serial interval of the posterior
+        ser_int = inference2._serial_interval
+        for k, si in enumerate(ser_int2):
+            single = bp.BranchProPosterior(df, si, 1, 0.2)
+            single.run_inference(tau=2)
+            npt.assert_array_almost_equal(
+                0.2 + inference2._window_sums(
+                    inference2._multi_prefix_sums(inference2.cases_data)[k],
+                    2),
+                1 / single.inference_posterior.kwds['scale'])
+        self.assertIs(inference2._serial_interval, ser_int)
+        npt.assert_array_almost_equal(
+            inference2.inference_posterior.kwds['scale'],
+            single.inference_posterior.kwds['scale'])
+
+        # Percentiles of samples drawn and reduced in chunks of time points
+        samples = np.random.gamma(5, size=(101, 3))
+        npt.assert_array_almost_equal(
+            bp.posterior._partition_percentiles(
+                samples.copy(), [0.025, 0.5, 0.975]),
+            np.percentile(samples, [2.5, 50, 97.5], axis=0))
+
+        np.random.seed(1)
+        inference2.run_inference(tau=2, num_samples=5000)
+        intervals_df = inference2.get_intervals(.95)
+        pd.testing.assert_frame_equal(
+            inference2.get_intervals(.95), intervals_df)
+        inference2.max_chunk_draws = 1
+        mean, percentiles = inference2._sampled_summaries([.025, .975])
+        npt.assert_allclose(mean, intervals_df['Mean'], rtol=0.02)
+        npt.assert_allclose(
+            percentiles[1], intervals_df['Upper bound CI'], rtol=0.05)
+        npt.assert_allclose(
+            mean, np.mean(
+                inference2._posterior_shape / inference2._posterior_rates,
+                axis=0), rtol=0.02)
+
+    def test_run_inference_multi_tau(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7, 9],
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5]
+        })
+        inference = bp.BranchProPosteriorMultSI(
+            df, [[1, 2], [0, 1]], 1, 0.2)
+
+        # Only a single serial interval would be used
+        with self.assertRaises(ValueError):
+            inference.run_inference_multi_tau([1, 2])
+
+        with self.assertRaises(ValueError):
+            inference.log_predictive_likelihood([1, 2])
+
+        with self.assertRaises(ValueError):
+            inference.select_tau([1, 2])
+
+    def test_append(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        inference = bp.BranchProPosteriorMultSI(
+            df, [[1, 2], [0, 1]], 1, 0.2)
+        inference.run_inference(2)
+
+        # The cache holds the sums of the current data array only
+        for time in range(7, 27):
+            inference.append(time, time % 5)
+        self.assertEqual(len(inference._infectiousness_cache), 2)
+        self.assertEqual(inference.inference_times[-1], 26)
+
+    def test_n_workers(self):
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7, 8],
+            'Incidence Number': [10, 3, 4, 6, 9, 4, 7]
+        })
+        ser_ints = [[1, 2, 1], [0, 1, 1], [3, 1, 0]]
+
+        inference = bp.BranchProPosteriorMultSI(df, ser_ints, 1, 0.2)
+        inference.run_inference(tau=2)
+        intervals_df = inference.get_intervals(.95)
+
+        parallel = bp.BranchProPosteriorMultSI(
+            df, ser_ints, 1, 0.2, n_workers=2)
+        parallel.run_inference(tau=2)
+        npt.assert_array_almost_equal(
+            parallel._posterior_rates, inference._posterior_rates)
+        pd.testing.assert_frame_equal(
+            parallel.get_intervals(.95), intervals_df)
+
+        parallel.run_inference(tau=2, num_samples=2000)
+        npt.assert_allclose(
+            parallel.get_intervals(.95)['Mean'], intervals_df['Mean'],
+            rtol=0.05)
+
+    def test_get_predictive_intervals(self):
+        df = pd.DataFrame({
+            'Time': list(range(1, 11)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7, 3, 4]
+        })
+        ser_ints = [[1, 2, 1, 0], [0, 1, 3, 1]]
+
+        inference = bp.BranchProPosteriorMultSI(df, ser_ints, 1, 0.2)
+        inference.run_inference(2)
+        predictive_df = inference.get_predictive_intervals(.9)
+
+        # Equal-weight mixture of the predictives of the serial intervals
+        components = []
+        for ser_int in ser_ints:
+            single = bp.BranchProPosterior(df, ser_int, 1, 0.2)
+            single.run_inference(2)
+            components.append(single.get_predictive_intervals(.9))
+            shape = single.inference_posterior.args[0]
+            rate = 1 / single.inference_posterior.kwds['scale']
+            success = rate / (rate + components[-1]['Mean'] * rate / shape)
+            components[-1]['CDF Lower'] = scipy.stats.nbinom.cdf(
+                predictive_df['Lower bound CI'], shape, success)
+            components[-1]['CDF Below Lower'] = scipy.stats.nbinom.cdf(
+                predictive_df['Lower bound CI'] - 1, shape, success)
+
+        npt.assert_array_almost_equal(
+            predictive_df['Mean'],
+            (components[0]['Mean'] + components[1]['Mean']) / 2)
+        npt.assert_array_almost_equal(
+            predictive_df['Observed Probability'][:-1],
+            (components[0]['Observed Probability'] +
+             components[1]['Observed Probability'])[:-1] / 2)
+
+        # The lower bound is the smallest count whose CDF reaches 0.05
+        cdf = (components[0]['CDF Lower'] + components[1]['CDF Lower']) / 2
+        cdf_below = (
+            components[0]['CDF Below Lower'] +
+            components[1]['CDF Below Lower']) / 2
+        self.assertTrue(np.all(cdf >= .05))
+        self.assertTrue(np.all(cdf_below < .05))
+
     def test_get_intervals(self):
         df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -221,6 +738,39 @@ class TestBranchProPosteriorMultSIClass(unittest.TestCase):
         self.assertEqual(
             intervals_df['Central Probability'].to_list(), [.95] * 3)
 
+        # Exact percentiles of the mixture of the posteriors
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        inference = bp.BranchProPosteriorMultSI(df, ser_ints, 1, 0.2)
+        inference.run_inference(tau=2)
+        intervals_df = inference.get_intervals(.9)
+
+        shape = inference._posterior_shape
+        rates = inference._posterior_rates
+        for bound, prob in [('Lower bound CI', .05), ('Upper bound CI', .95)]:
+            npt.assert_array_almost_equal(
+                np.mean(scipy.stats.gamma.cdf(
+                    intervals_df[bound].to_numpy(), shape, scale=1/rates),
+                    axis=0),
+                [prob] * 3)
+        npt.assert_array_almost_equal(
+            intervals_df['Mean'], np.mean(shape / rates, axis=0))
+
+        single = bp.BranchProPosterior(df, ser_ints[0], 1, 0.2)
+        single.run_inference(tau=2)
+        npt.assert_array_almost_equal(
+            bp.posterior._gamma_mixture_quantiles(
+                shape, rates[:1], [.05, .95]),
+            single.inference_posterior.interval(.9))
+
+        np.random.seed(1)
+        inference.run_inference(tau=2, num_samples=10000)
+        npt.assert_allclose(
+            inference.get_intervals(.9)['Upper bound CI'],
+            intervals_df['Upper bound CI'], rtol=0.05)
+
 
 #
 # TestLocImpBranchProPosterior Class
@@ -279,6 +829,40 @@ class TestLocImpBranchProPosteriorClass(unittest.TestCase):
         self.assertTrue(
             'No imported incidence column' in str(test_excep.exception))
 
+    def test__init__arrays(self):
+        cases = np.array([10, 3, 4, 0, 6, 9])
+        imported = np.array([1, 0, 2, 5, 0, 1])
+        ser_int = [1, 2, 1]
+
+        inference = bp.LocImpBranchProPosterior(
+            cases, imported, 0.3, ser_int, 1, 0.2, time_start=1)
+        self.assertIs(inference.imp_cases_data, imported)
+
+        df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6],
+            'Incidence Number': [10, 3, 4, 6, 9]
+        })
+        imp_df = pd.DataFrame({
+            'Time': [1, 3, 4, 6],
+            'Incidence Number': [1, 2, 5, 1]
+        })
+        df_inference = bp.LocImpBranchProPosterior(
+            df, imp_df, 0.3, ser_int, 1, 0.2)
+        inference.run_inference(2)
+        df_inference.run_inference(2)
+        npt.assert_array_almost_equal(
+            inference.inference_posterior.kwds['scale'],
+            df_inference.inference_posterior.kwds['scale'])
+
+        # Imported dataframe padded over the times of the local array
+        inference = bp.LocImpBranchProPosterior(
+            cases, imp_df, 0.3, ser_int, 1, 0.2, time_start=1)
+        npt.assert_array_equal(inference.imp_cases_data, imported)
+
+        with self.assertRaises(ValueError):
+            bp.LocImpBranchProPosterior(
+                cases, imported[1:], 0.3, ser_int, 1, 0.2)
+
     def test_set_epsilon(self):
         local_df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -296,6 +880,213 @@ class TestLocImpBranchProPosteriorClass(unittest.TestCase):
 
         self.assertEqual(inference.epsilon, 1)
 
+    def test_append(self):
+        local_df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [10, 3, 4, 6, 9, 2]
+        })
+        imp_df = pd.DataFrame({
+            'Time': [1, 2, 3, 4, 6, 7],
+            'Incidence Number': [1, 0, 2, 5, 1, 3]
+        })
+        ser_int = [1, 2, 1]
+
+        full = bp.LocImpBranchProPosterior(
+            local_df, imp_df, 0.3, ser_int, 1, 0.2)
+        full.run_inference(tau=2)
+
+        inference = bp.LocImpBranchProPosterior(
+            local_df[:3], imp_df[:3], 0.3, ser_int, 1, 0.2)
+        inference.run_inference(tau=2)
+        inference.append(4, 0, 5)
+        inference.append(5, 6)
+        inference.append(6, 9, 1)
+        inference.append(7, 2, 3)
+
+        npt.assert_array_equal(inference.imp_cases_data, full.imp_cases_data)
+        npt.assert_array_almost_equal(
+            inference.inference_estimates, full.inference_estimates)
+
+        # Settings changed since the inference apply to all the windows
+        for update in [
+                lambda posterior: posterior.set_epsilon(3.0),
+                lambda posterior: posterior.set_prior_moments(2, 1),
+                lambda posterior: posterior.set_serial_intervals([1, 1])]:
+            inference = bp.LocImpBranchProPosterior(
+                local_df[:5], imp_df[:5], 0.3, ser_int, 1, 0.2)
+            inference.run_inference(tau=2)
+            update(inference)
+            inference.append(7, 2, 3)
+
+            full = bp.LocImpBranchProPosterior(
+                local_df, imp_df, 0.3, ser_int, 1, 0.2)
+            update(full)
+            full.run_inference(tau=2)
+            npt.assert_array_almost_equal(
+                inference.inference_estimates, full.inference_estimates)
+            npt.assert_array_almost_equal(
+                inference.inference_posterior.std(),
+                full.inference_posterior.std())
+
+    def test_run_inference_multi_tau(self):
+        local_df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [10, 3, 4, 6, 9, 2]
+        })
+        imp_df = pd.DataFrame({
+            'Time': [1, 2, 3, 4, 6, 7],
+            'Incidence Number': [1, 0, 2, 5, 1, 3]
+        })
+        ser_int = [1, 2, 1]
+
+        inference = bp.LocImpBranchProPosterior(
+            local_df, imp_df, 0.3, ser_int, 1, 0.2)
+        times, shape, rate = inference.run_inference_multi_tau([2])
+        inference.run_inference(2)
+
+        self.assertListEqual(list(times), inference.inference_times)
+        npt.assert_array_almost_equal(
+            1 / rate[0], inference.inference_posterior.kwds['scale'])
+
+    def test_run_inference_epsilon_sweep(self):
+        local_df = pd.DataFrame({
+            'Time': [1, 2, 3, 5, 6, 7],
+            'Incidence Number': [10, 3, 4, 6, 9, 2]
+        })
+        imp_df = pd.DataFrame({
+            'Time': [1, 2, 3, 4, 6, 7],
+            'Incidence Number': [1, 0, 2, 5, 1, 3]
+        })
+        ser_int = [1, 2, 1]
+        epsilons = [-1, 0, 0.3, 2]
+
+        inference = bp.LocImpBranchProPosterior(
+            local_df, imp_df, 0.3, ser_int, 1, 0.2)
+        times, shape, rate = inference.run_inference_epsilon_sweep(
+            2, epsilons)
+        self.assertEqual(shape.shape, (4, 4))
+        self.assertEqual(rate.shape, (4, 4))
+        self.assertEqual(inference.epsilon, 0.3)
+
+        for epsilon, eps_shape, eps_rate in zip(epsilons, shape, rate):
+            inference.set_epsilon(epsilon)
+            inference.run_inference(2)
+            self.assertListEqual(list(times), inference.inference_times)
+            npt.assert_array_almost_equal(
+                eps_shape, inference.inference_posterior.args[0])
+            npt.assert_array_almost_equal(
+                1 / eps_rate, inference.inference_posterior.kwds['scale'])
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_epsilon_sweep(2, [[0]])
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_epsilon_sweep(2, [0, -2])
+
+    def test_run_inference_epsilon_marginal(self):
+        local_df = pd.DataFrame({
+            'Time': list(range(1, 9)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7]
+        })
+        imp_df = pd.DataFrame({
+            'Time': list(range(1, 9)),
+            'Incidence Number': [1, 0, 2, 5, 1, 3, 0, 0]
+        })
+        ser_int = [1, 2, 1]
+        epsilons = np.array([-1, 0, 0.5, 2])
+
+        inference = bp.LocImpBranchProPosterior(
+            local_df, imp_df, 0.3, ser_int, 1, 0.2)
+        inference.run_inference_epsilon_marginal(2, epsilons, [1, 2, 1, 1])
+        self.assertEqual(inference.epsilon, 0.3)
+        self.assertEqual(inference.epsilon_posterior.shape, (4, 5))
+        npt.assert_array_almost_equal(
+            np.sum(inference.epsilon_posterior, axis=0), np.ones(5))
+
+        # Posterior of epsilon from the marginal likelihood integrated
+        # numerically over R in the first window
+        local, imported = (
+            inference._infectiousness(data)
+            for data in (inference.cases_data, inference.imp_cases_data))
+        window = inference.cases_data[1:4]
+        r_values = np.linspace(1e-6, 20, 100001)
+        marginal = []
+        for epsilon, weight in zip(epsilons, [1, 2, 1, 1]):
+            infectiousness = (local + (1 + epsilon) * imported)[1:4]
+            likelihood = np.exp(np.sum(scipy.stats.poisson.logpmf(
+                window[:, np.newaxis],
+                r_values * infectiousness[:, np.newaxis]), axis=0))
+            marginal.append(weight * np.trapz(
+                likelihood * scipy.stats.gamma.pdf(
+                    r_values, 1, scale=1/0.2), r_values))
+        npt.assert_array_almost_equal(
+            inference.epsilon_posterior[:, 0], marginal / np.sum(marginal))
+
+        # Intervals of the mixture over epsilon
+        intervals_df = inference.get_intervals(.9)
+        _, shape, rate = inference.run_inference_epsilon_sweep(2, epsilons)
+        npt.assert_array_almost_equal(
+            intervals_df['Mean'],
+            np.sum(inference.epsilon_posterior * shape / rate, axis=0))
+        for key, prob in [('Lower bound CI', .05), ('Upper bound CI', .95)]:
+            npt.assert_array_almost_equal(
+                np.sum(inference.epsilon_posterior * scipy.stats.gamma.cdf(
+                    intervals_df[key].to_numpy(), shape, scale=1/rate),
+                    axis=0),
+                prob * np.ones(5))
+
+        epsilon_df = inference.get_epsilon_posterior()
+        self.assertEqual(len(epsilon_df), 20)
+        self.assertEqual(
+            epsilon_df['Epsilon'].to_list(), [-1] * 5 + [0] * 5 +
+            [0.5] * 5 + [2] * 5)
+
+        # Single epsilon inference is used again after run_inference
+        inference.run_inference(2)
+        intervals_df = inference.get_intervals(.9)
+        npt.assert_array_almost_equal(
+            intervals_df['Upper bound CI'],
+            inference.inference_posterior.ppf(.95))
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_epsilon_marginal(2, epsilons, [1, 1])
+
+        with self.assertRaises(ValueError):
+            inference.run_inference_epsilon_marginal(
+                2, epsilons, [0, 0, 0, 0])
+
+    def test_get_predictive_intervals(self):
+        local_df = pd.DataFrame({
+            'Time': list(range(1, 9)),
+            'Incidence Number': [10, 3, 4, 6, 9, 2, 5, 7]
+        })
+        imp_df = pd.DataFrame({
+            'Time': list(range(1, 9)),
+            'Incidence Number': [1, 0, 2, 5, 1, 3, 0, 0]
+        })
+        epsilons = [0, 2]
+
+        inference = bp.LocImpBranchProPosterior(
+            local_df, imp_df, 0.3, [1, 2, 1], 1, 0.2)
+        inference.run_inference_epsilon_marginal(2, epsilons)
+        predictive_df = inference.get_predictive_intervals(.9)
+        self.assertEqual(len(predictive_df), 5)
+
+        # Mixture of the predictives of the values of epsilon
+        means, probabilities = 0, 0
+        for epsilon, weights in zip(
+                epsilons, inference.epsilon_posterior):
+            single = bp.LocImpBranchProPosterior(
+                local_df, imp_df, epsilon, [1, 2, 1], 1, 0.2)
+            single.run_inference(2)
+            single_df = single.get_predictive_intervals(.9)
+            means += weights * single_df['Mean']
+            probabilities += weights * single_df['Observed Probability']
+
+        npt.assert_array_almost_equal(predictive_df['Mean'], means)
+        npt.assert_array_almost_equal(
+            predictive_df['Observed Probability'][:-1], probabilities[:-1])
+
     def test_run_inference(self):
         local_df = pd.DataFrame({
             'Time': [1, 2, 3, 5, 6],
@@ -389,3 +1180,27 @@ class TestLocImpBranchProPosteriorMultSIClass(unittest.TestCase):
         self.assertEqual(len(inference2.inference_estimates), 3)
         self.assertEqual(len(inference2.inference_times), 3)
         self.assertEqual(len(inference2.inference_posterior.mean()), 3)
+
+        for k, si in enumerate(ser_int2):
+            single = bp.LocImpBranchProPosterior(
+                local_df, imp_df, 0.3, si, 1, 0.2)
+            single.run_inference(tau=2)
+            npt.assert_array_almost_equal(
+                inference2._posterior_rates[k],
+                1 / single.inference_posterior.kwds['scale'])
+        npt.assert_array_almost_equal(
+            inference2.inference_posterior.kwds['scale'],
+            single.inference_posterior.kwds['scale'])
+
+        parallel = bp.LocImpBranchProPosteriorMultSI(
+            local_df, imp_df, 0.3, ser_int2, 1, 0.2, n_workers=2)
+        parallel.run_inference(tau=2)
+        npt.assert_array_almost_equal(
+            parallel._posterior_rates, inference2._posterior_rates)
+
+        # Only a single serial interval would be used
+        with self.assertRaises(ValueError):
+            inference2.run_inference_epsilon_sweep(2, [0, 1])
+
+        with self.assertRaises(ValueError):
+            inference2.run_inference_epsilon_marginal(2, [0, 1])
@@ -0,0 +1,39 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestCompactSerialInterval(unittest.TestCase):
+    """
+    Test the 'compact_serial_interval' function.
+    """
+    def test_compact_serial_interval(self):
+        trimmed, error = bp.compact_serial_interval([0, 5, 3, 1, 0.5, 0.5], .1)
+        npt.assert_array_equal(trimmed, [0, 5, 3, 1])
+        self.assertAlmostEqual(error, .1)
+
+        # Trailing zeros only are removed with zero tolerance
+        trimmed, error = bp.compact_serial_interval([0, 1, 2, 0, 0], 0)
+        npt.assert_array_equal(trimmed, [0, 1, 2])
+        self.assertEqual(error, 0)
+
+        # Rows of several serial intervals share a common length
+        trimmed, error = bp.compact_serial_interval(
+            [[1, 1, 0, 0], [1, 1, 1, 0]], 0)
+        npt.assert_array_equal(trimmed, [[1, 1, 0], [1, 1, 1]])
+        npt.assert_array_equal(error, [0, 0])
+
+        with self.assertRaises(ValueError):
+            bp.compact_serial_interval([1, 2], 1)
+
+        with self.assertRaises(ValueError):
+            bp.compact_serial_interval([[[1, 2]]], .1)
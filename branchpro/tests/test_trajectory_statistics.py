@@ -0,0 +1,67 @@
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+import branchpro as bp
+
+
+class TestTrajectoryStatistics(unittest.TestCase):
+    """
+    Test the trajectory summary statistics functions.
+    """
+    def test_trajectory_statistics(self):
+        incidences = np.array([
+            [1, 3, 2, 0, 0],
+            [1, 2, 4, 5, 1],
+            [0, 0, 0, 0, 0]
+        ])
+        stats_df = bp.trajectory_statistics(
+            incidences, times=[10, 11, 12, 13, 14])
+
+        self.assertListEqual(stats_df['Peak Time'].to_list(), [11, 13, 10])
+        self.assertListEqual(stats_df['Peak Size'].to_list(), [3, 5, 0])
+        self.assertListEqual(stats_df['Attack Size'].to_list(), [6, 13, 0])
+        npt.assert_array_equal(
+            stats_df['Extinction Time'].to_numpy(), [13, np.nan, 10])
+
+        # A single trajectory is accepted
+        stats_df = bp.trajectory_statistics([1, 3, 2, 0, 0])
+        self.assertListEqual(stats_df['Extinction Time'].to_list(), [3])
+
+        with self.assertRaises(ValueError):
+            bp.trajectory_statistics(np.zeros((2, 2, 2)))
+
+        with self.assertRaises(ValueError):
+            bp.trajectory_statistics(incidences, times=[1, 2])
+
+    def test_exceedance_probabilities(self):
+        incidences = np.array([
+            [1, 3, 2, 0],
+            [1, 2, 4, 5],
+            [0, 0, 0, 0],
+            [2, 1, 0, 0]
+        ])
+        exceedance_df = bp.exceedance_probabilities(incidences, [0, 2, 4])
+
+        self.assertListEqual(exceedance_df['Threshold'].to_list(), [0, 2, 4])
+        self.assertListEqual(
+            exceedance_df['Probability'].to_list(), [.75, .5, .25])
+
+        exceedance_df = bp.exceedance_probabilities(
+            incidences, [0, 2], by_time=True)
+
+        self.assertListEqual(
+            exceedance_df['Time Points'].to_list(), [0, 1, 2, 3])
+        self.assertListEqual(exceedance_df[0].to_list(), [.75, .75, .5, .25])
+        self.assertListEqual(exceedance_df[2].to_list(), [0, .25, .25, .25])
+
+        with self.assertRaises(ValueError):
+            bp.exceedance_probabilities(incidences, [[1]])
@@ -0,0 +1,128 @@
+#
+# Trajectory summary statistics
+#
+# This file is part of BRANCHPRO
+# (https://github.com/SABS-R3-Epidemiology/branchpro.git) which is released
+# under the BSD 3-clause license. See accompanying LICENSE.md for copyright
+# notice and full license details.
+#
+
+import numpy as np
+import pandas as pd
+
+
+def _as_trajectories(incidences, times):
+    """
+    Checks the shape of an ensemble of simulated incidences and returns it
+    as a 2-dimensional array together with the matching times.
+    """
+    incidences = np.asarray(incidences)
+    if incidences.ndim == 1:
+        incidences = incidences[np.newaxis, :]
+    if incidences.ndim != 2:
+        raise ValueError(
+            'Incidences storage format must be 1- or 2-dimensional')
+
+    if times is None:
+        times = np.arange(incidences.shape[1])
+    times = np.asarray(times)
+    if times.shape != (incidences.shape[1],):
+        raise ValueError('Times must match the number of incidence columns')
+
+    return incidences, times
+
+
+def trajectory_statistics(incidences, times=None):
+    """
+    Returns a dataframe of summary statistics of each simulated trajectory
+    of an ensemble, computed in a single vectorised pass.
+
+    The results are returned in a dataframe with one row per trajectory and
+    the following columns: 'Peak Time', 'Peak Size', 'Attack Size' (total
+    number of cases) and 'Extinction Time' (first time point from which no
+    further cases occur, or NaN if cases still occur at the last time point).
+
+    Parameters
+    ----------
+    incidences
+        (numpy array) incidence numbers of shape ``(n_runs, n_times)``, or of
+        shape ``(n_times,)`` for a single trajectory.
+    times
+        times of the incidence numbers, e.g. the regime of a
+        :class:`SimulationController`; defaults to ``0, 1, ..., n_times-1``.
+    """
+    incidences, times = _as_trajectories(incidences, times)
+    num_times = incidences.shape[1]
+
+    # Index of the last time point with cases; -1 if there are none
+    positive = incidences > 0
+    last_positive = num_times - 1 - np.argmax(positive[:, ::-1], axis=1)
+    last_positive[~np.any(positive, axis=1)] = -1
+
+    extinct = last_positive < num_times - 1
+    extinction_time = np.full(incidences.shape[0], np.nan)
+    extinction_time[extinct] = times[last_positive[extinct] + 1]
+
+    return pd.DataFrame(
+        {
+            'Peak Time': times[np.argmax(incidences, axis=1)],
+            'Peak Size': np.max(incidences, axis=1),
+            'Attack Size': np.sum(incidences, axis=1),
+            'Extinction Time': extinction_time
+        }
+    )
+
+
+def exceedance_probabilities(incidences, thresholds, times=None,
+                             by_time=False):
+    """
+    Returns a dataframe of the probabilities that the incidence exceeds each
+    of the given thresholds, estimated from an ensemble of simulated
+    trajectories.
+
+    By default, the results are returned in a dataframe with the columns
+    'Threshold' and 'Probability', the fraction of trajectories whose
+    incidence exceeds the threshold at any time point. If ``by_time`` is True,
+    the dataframe instead has one row per time point, the column 'Time Points'
+    and one column per threshold with the fraction of trajectories whose
+    incidence exceeds it at that time point.
+
+    Parameters
+    ----------
+    incidences
+        (numpy array) incidence numbers of shape ``(n_runs, n_times)``, or of
+        shape ``(n_times,)`` for a single trajectory.
+    thresholds
+        sequence of incidence thresholds.
+    times
+        times of the incidence numbers, e.g. the regime of a
+        :class:`SimulationController`; defaults to ``0, 1, ..., n_times-1``.
+    by_time
+        (bool) whether to return the exceedance probabilities at each time
+        point rather than at any time point.
+    """
+    incidences, times = _as_trajectories(incidences, times)
+    thresholds = np.asarray(thresholds)
+    if thresholds.ndim != 1:
+        raise ValueError(
+            'Thresholds storage format must be 1-dimensional')
+
+    if not by_time:
+        peaks = np.max(incidences, axis=1)
+        return pd.DataFrame(
+            {
+                'Threshold': thresholds,
+                'Probability': np.mean(
+                    peaks[np.newaxis, :] > thresholds[:, np.newaxis], axis=1)
+            }
+        )
+
+    # Fraction of trajectories above each threshold at each time point
+    exceedance_df = pd.DataFrame(
+        np.mean(
+            incidences[np.newaxis, :, :] > thresholds[:, None, None],
+            axis=1).T,
+        columns=list(thresholds))
+    exceedance_df.insert(0, 'Time Points', times)
+
+    return exceedance_df
@@ -146,7 +146,15 @@ def doctest_rst_and_public_interface():
         'branchpro.version_info',
         'branchpro.simulation',
         'branchpro.apps',
-        'branchpro.posterior'
+        'branchpro.posterior',
+        'branchpro.abc_inference',
+        'branchpro.particle_filter',
+        'branchpro.serial_interval',
+        'branchpro.trajectory_statistics',
+        'branchpro.extinction',
+        'branchpro.multi_region',
+        'branchpro.backtesting',
+        'branchpro.inference_result',
         ]
 
     doc_symbols = get_all_documented_symbols()